@@ -27,7 +27,7 @@ login_manager.login_view = 'auth.login'
 
 # Import database and vector database
 from database import db, User
-from services.vector_db import vector_db
+from services.vector_db import get_vector_db
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -102,6 +102,26 @@ def profile():
         member_since = 'N/A'
     return render_template('profile.html', member_since=member_since)
 
+def _attach_previews(results, user_id):
+    """Fill result previews from the database; vector metadata only carries ids"""
+    ids = {'resume': set(), 'job': set()}
+    for r in results:
+        kind = r.get('type')
+        obj_id = (r.get('metadata') or {}).get(f'{kind}_id')
+        if kind in ids and obj_id is not None:
+            # Pinecone returns numeric metadata as floats
+            ids[kind].add(int(obj_id))
+    texts = {}
+    for row in db.get_resume_texts(sorted(ids['resume']), user_id):
+        texts[('resume', row['id'])] = row.get('tailored_text') or row.get('original_text') or ''
+    for row in db.get_job_texts(sorted(ids['job']), user_id):
+        texts[('job', row['id'])] = row.get('description_text') or ''
+    for r in results:
+        kind = r.get('type')
+        obj_id = (r.get('metadata') or {}).get(f'{kind}_id')
+        if obj_id is not None:
+            r['preview'] = texts.get((kind, int(obj_id)), '')[:200]
+
 @app.route('/api/search')
 @login_required
 def semantic_search():
@@ -113,12 +133,13 @@ def semantic_search():
         return jsonify({'results': []})
     
     try:
-        results = vector_db.semantic_search(
+        results = get_vector_db().semantic_search(
             query=query,
             search_type=search_type,
             user_id=current_user.id,
             top_k=10
         )
+        _attach_previews(results, current_user.id)
         return jsonify({'results': results})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -138,7 +159,7 @@ def profile_stats():
         total_jobs = len(user_jobs)
         
         # Get vector database statistics
-        vector_stats = vector_db.get_user_embeddings_stats(current_user.id)
+        vector_stats = get_vector_db().get_user_embeddings_stats(current_user.id)
         total_embeddings = vector_stats.get('resumes', 0) + vector_stats.get('jobs', 0)
         
         return jsonify({
@@ -89,6 +89,13 @@ class SupabaseDB:
         result = self.client.table('resumes').select('*').eq('id', resume_id).eq('user_id', user_id).execute()
         return result.data[0] if result.data else None
     
+    def get_resume_texts(self, resume_ids: List[int], user_id: int) -> List[Dict[str, Any]]:
+        """Get only the text columns of specific resumes for a user"""
+        if not resume_ids:
+            return []
+        result = self.client.table('resumes').select('id, original_text, tailored_text').in_('id', resume_ids).eq('user_id', user_id).execute()
+        return result.data if result.data else []
+    
     def update_resume(self, resume_id: int, user_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Update resume"""
         updates['updated_at'] = datetime.utcnow().isoformat()
@@ -133,6 +140,13 @@ class SupabaseDB:
         result = self.client.table('job_descriptions').select('*').eq('id', job_id).eq('user_id', user_id).execute()
         return result.data[0] if result.data else None
     
+    def get_job_texts(self, job_ids: List[int], user_id: int) -> List[Dict[str, Any]]:
+        """Get only the description text of specific job descriptions for a user"""
+        if not job_ids:
+            return []
+        result = self.client.table('job_descriptions').select('id, description_text').in_('id', job_ids).eq('user_id', user_id).execute()
+        return result.data if result.data else []
+    
     def delete_job(self, job_id: int, user_id: int) -> bool:
         """Delete job description"""
         result = self.client.table('job_descriptions').delete().eq('id', job_id).eq('user_id', user_id).execute()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Resume Tailor Vector Namespace Migration Script
+Moves embeddings stored before per-user Pinecone namespaces into user_<id> namespaces
+"""
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from services.vector_db import get_vector_db
+
+if __name__ == "__main__":
+    print("🚀 Resume Tailor Vector Namespace Migration")
+    print("=" * 40)
+    
+    try:
+        counts = get_vector_db().migrate_to_user_namespaces()
+        print(f"\n✅ Moved {counts['moved']} vectors into per-user namespaces")
+        print(f"   Skipped {counts['skipped']} already migrated, {counts['unowned']} without a user_id")
+    except Exception as e:
+        print(f"\n💥 Migration failed: {e}")
+        print("\nPlease check PINECONE_API_KEY / PINECONE_INDEX_NAME and try again.")
+        raise SystemExit(1)
@@ -7,7 +7,7 @@ messages_bp = Blueprint('messages', __name__)
 
 @messages_bp.route('/generate', methods=['POST'])
 @login_required
-def generate_message():
+async def generate_message():
     """Generate outreach message for a job"""
     data = request.get_json()
     job_id = data.get('job_id')
@@ -23,7 +23,7 @@ def generate_message():
     
     try:
         generator = MessageGenerator()
-        message_content = generator.generate_message(
+        message_content = await generator.agenerate_message(
             job_description=job.description_text,
             company=job.company,
             job_title=job.title,
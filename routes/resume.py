@@ -1,18 +1,19 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, current_app, make_response, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, current_app, make_response, session, Response, stream_with_context
 from dateutil.parser import parse as parse_date
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from database import db
 from services.latex_generator import LaTeXGenerator
+from services.openai_latex import OpenAILaTeXGenerator
 from xhtml2pdf import pisa
 import io
 from services.ai_workflow import ResumeAIWorkflow
-from services.vector_db import PineconeVectorDB
+from services.vector_db import get_vector_db
 from services.resume_processor import ResumeProcessor
 from services.resume_generator import ResumeContentGenerator
 from services.resume_schema import ResumeData
 from services.cover_letter_generator import CoverLetterGenerator
-from services.tavily_client import TavilyClient
+from services.tavily_client import get_tavily_client
 from pydantic import BaseModel, Field
 import os
 import tempfile
@@ -25,9 +26,6 @@ resume_bp = Blueprint('resume', __name__)
 
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx'}
 
-# Initialize vector DB client once
-vector_db = PineconeVectorDB()
-
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -92,7 +90,7 @@ def upload():
                 
                 # Store resume embedding in Pinecone
                 try:
-                    vector_db.store_resume_embedding(
+                    get_vector_db().store_resume_embedding(
                         resume_id=resume_data['id'],
                         user_id=current_user.id,
                         resume_text=(resume_text or '').strip(),
@@ -172,7 +170,7 @@ def tailor(resume_id):
         if similar_on and job_description:
             try:
                 from services.recommended_skills import RecommendedSkillsBundle, aggregate_skills_from_web
-                tav = TavilyClient(api_key=current_app.config.get('TAVILY_API_KEY'))
+                tav = get_tavily_client(api_key=current_app.config.get('TAVILY_API_KEY'))
                 # Build a simple query; in real use, would extract job title via LLM or regex
                 query = (resume.get('title') or '').strip() or job_description.split('\n', 1)[0][:120]
                 web_results = tav.search_jobs(query, max_results=5)
@@ -225,7 +223,7 @@ def tailor(resume_id):
             logging.info(f"Pinecone metadata: {pinecone_metadata}")
 
             try:
-                vector_db.store_resume_embedding(
+                get_vector_db().store_resume_embedding(
                     resume_id=resume_id,
                     user_id=current_user.id,
                     resume_text=result['tailored_resume'],
@@ -511,6 +509,20 @@ def get_recommended_skills(resume_id):
     data = resume.get('recommended_skills') or {}
     return jsonify({'success': True, 'recommended_skills': data})
 
+@resume_bp.route('/latex-stream/<int:resume_id>')
+@login_required
+def stream_resume_latex(resume_id):
+    """Stream LaTeX for a resume token-by-token so the client can start rendering early."""
+    resume = db.get_resume_by_id(resume_id, current_user.id)
+    if not resume:
+        return jsonify({'error': 'Resume not found'}), 404
+
+    resume_text = resume.get('original_text', '') or ''
+    job_description = resume.get('job_description') or None
+    generator = OpenAILaTeXGenerator()
+    stream = generator.generate_resume_latex_stream(resume_text, job_description)
+    return Response(stream_with_context(stream), mimetype='text/plain')
+
 def convert_text_to_html(text: str) -> str:
     """Convert plain text resume to formatted HTML"""
     if not text:
@@ -0,0 +1,20 @@
+import asyncio
+import threading
+
+# Async HTTP connection pools are bound to the event loop they first run on, so the
+# pooled clients (OpenAI, Tavily) all do their async work on one long-lived
+# background loop.
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, name='async-client-loop', daemon=True).start()
+
+
+def run_sync(coro):
+    """Run a coroutine on the shared loop and block until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+async def on_shared_loop(coro):
+    """Await a coroutine on the shared loop from any event loop"""
+    if asyncio.get_running_loop() is _loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _loop))
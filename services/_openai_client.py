@@ -0,0 +1,65 @@
+import os
+import asyncio
+from functools import lru_cache
+import httpx
+import openai
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from services._async_loop import on_shared_loop
+
+# Shared OpenAI clients backed by pooled keep-alive HTTP connections, so TCP+TLS
+# handshakes are paid once per process instead of once per service instance.
+
+_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+# Retry transient failures (429, 5xx, network) with jittered exponential backoff;
+# auth and invalid-request errors are raised immediately so callers can fall back.
+openai_retry = retry(
+    stop=stop_after_attempt(4),
+    wait=wait_random_exponential(min=1, max=20),
+    retry=retry_if_exception_type((openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)),
+    reraise=True
+)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except Exception:  # pragma: no cover
+        return False
+
+
+@lru_cache(maxsize=1)
+def get_sync_client() -> openai.OpenAI:
+    """Process-wide synchronous OpenAI client"""
+    return openai.OpenAI(
+        api_key=os.environ.get('OPENAI_API_KEY'),
+        max_retries=0,  # retries are handled by openai_retry
+        http_client=httpx.Client(http2=_http2_available(), timeout=_TIMEOUT, limits=_LIMITS)
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_client() -> openai.AsyncOpenAI:
+    """Process-wide async OpenAI client; only use it on the client loop (see on_client_loop)"""
+    return openai.AsyncOpenAI(
+        api_key=os.environ.get('OPENAI_API_KEY'),
+        max_retries=0,  # retries are handled by openai_retry
+        http_client=httpx.AsyncClient(http2=_http2_available(), timeout=_TIMEOUT, limits=_LIMITS)
+    )
+
+
+# Cap in-flight async requests so gather() fan-out doesn't trigger self-inflicted 429s.
+# Only ever used on the shared loop.
+_CONCURRENCY = asyncio.Semaphore(int(os.environ.get('OPENAI_MAX_CONCURRENCY', '20')))
+
+
+async def _limited(coro):
+    async with _CONCURRENCY:
+        return await coro
+
+
+async def on_client_loop(coro):
+    """Await a coroutine on the shared client loop from any event loop (concurrency-limited)"""
+    return await on_shared_loop(_limited(coro))
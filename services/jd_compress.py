@@ -0,0 +1,77 @@
+import re
+import math
+from typing import List
+
+from services.recommended_skills import SKILL_CANDIDATES
+from services.token_budget import count_tokens, fit
+
+# Sections that never help the model write outreach (company boilerplate, perks, legal).
+# Only a short heading line of its own starts a section, which then runs until a blank
+# line or the next "Heading:" line, so a single-paragraph posting that merely mentions
+# benefits is left alone.
+_BOILERPLATE_RE = re.compile(
+    r"^[ \t]*[^\n.!?]{0,30}\b(?:equal opportunity|about us|benefits|perks|what we offer)\b"
+    r"[^\n.!?]{0,30}[ \t]*$"
+    r"(?:\n(?![ \t]*$)(?![^\n]{0,60}:[ \t]*$)[^\n]*)*",
+    re.IGNORECASE | re.MULTILINE
+)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD_RE = re.compile(r"[a-z0-9+#./-]+")
+
+# Words that mark requirement/responsibility sentences even without a named skill
+_REQUIREMENT_TERMS = frozenset({
+    "experience", "years", "required", "requirements", "must", "proficient", "proficiency",
+    "knowledge", "skills", "degree", "responsibilities", "responsible", "build", "design",
+    "develop", "lead", "qualifications", "preferred"
+})
+_VOCABULARY = SKILL_CANDIDATES | _REQUIREMENT_TERMS
+
+
+def compress(jd: str, max_tokens: int = 400) -> str:
+    """Extractively shrink a job description to its skill/requirement sentences.
+
+    Boilerplate sections are dropped, remaining sentences are ranked by TF-IDF
+    weight of the vocabulary terms they contain, and the best ones are kept in
+    their original order until the token budget is spent.
+    """
+    if not jd:
+        return ""
+    if count_tokens(jd) <= max_tokens:
+        return jd.strip()
+
+    text = _BOILERPLATE_RE.sub("\n", jd)
+    # Postings often repeat themselves; keep the first occurrence of each sentence
+    sentences = list(dict.fromkeys(s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s and s.strip()))
+    if not sentences:
+        # Everything looked like boilerplate; better to send the posting as-is than nothing
+        return fit(jd.strip(), max_tokens)
+
+    terms_per_sentence: List[set] = [
+        set(_WORD_RE.findall(s.lower())) & _VOCABULARY for s in sentences
+    ]
+    doc_freq = {}
+    for terms in terms_per_sentence:
+        for term in terms:
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+    n = len(sentences)
+    scores = [
+        sum(math.log(1 + n / doc_freq[term]) for term in terms)
+        for terms in terms_per_sentence
+    ]
+
+    ranked = sorted(range(n), key=lambda i: scores[i], reverse=True)
+    kept, used = set(), 0
+    for i in ranked:
+        if scores[i] <= 0:
+            break
+        cost = count_tokens(sentences[i]) + 1
+        if used + cost > max_tokens:
+            continue
+        kept.add(i)
+        used += cost
+
+    if not kept:
+        # Nothing matched the vocabulary (or fit); keep the leading text that fits
+        return fit("\n".join(sentences), max_tokens)
+
+    return "\n".join(sentences[i] for i in sorted(kept))
@@ -1,6 +1,7 @@
 import re
 from typing import List, Dict, Set
 from collections import Counter
+from itertools import chain
 import string
 
 class KeywordExtractor:
@@ -38,6 +39,67 @@ class KeywordExtractor:
             'collaborative', 'innovative', 'strategic thinking', 'customer focused'
         ]
         
+        # Common business/industry terms
+        self.business_terms = [
+            'agile', 'scrum', 'kanban', 'devops', 'ci/cd', 'microservices',
+            'api', 'rest', 'graphql', 'machine learning', 'artificial intelligence',
+            'data science', 'big data', 'analytics', 'business intelligence',
+            'cybersecurity', 'blockchain', 'iot', 'mobile development',
+            'web development', 'full stack', 'frontend', 'backend', 'ui/ux'
+        ]
+        
+        # Certification keywords
+        self.cert_keywords = [
+            'certification', 'certified', 'license', 'licensed', 'aws certified',
+            'microsoft certified', 'google certified', 'cisco certified',
+            'pmp', 'cissp', 'cisa', 'cism'
+        ]
+        
+        # Precompiled (display name, pattern) pairs for the per-keyword scans.
+        # Technical skills also match the .js / ++ / # variations.
+        self._technical_patterns = [
+            (self._format_technical_skill(skill),
+             re.compile(rf'\b{re.escape(skill)}(?:\b|\.js\b|\+\+\b|#\b)', re.IGNORECASE))
+            for skills in self.technical_skills.values() for skill in skills
+        ]
+        self._soft_patterns = [
+            (skill.title(), re.compile(rf'\b{re.escape(skill)}\b', re.IGNORECASE))
+            for skill in self.soft_skills
+        ]
+        self._domain_patterns = [
+            (self._format_domain_term(term), re.compile(rf'\b{re.escape(term)}\b', re.IGNORECASE))
+            for term in self.business_terms
+        ]
+        self._cert_patterns = [
+            (keyword.title(), re.compile(rf'\b{re.escape(keyword)}\b', re.IGNORECASE))
+            for keyword in self.cert_keywords
+        ]
+        self._degree_patterns = [
+            re.compile(r'\b(bachelor\'?s?|master\'?s?|phd|doctorate)\s+(?:degree\s+)?(?:in\s+)?(\w+)', re.IGNORECASE),
+            re.compile(r'\b(bs|ms|ba|ma)\s+(?:in\s+)?(\w+)', re.IGNORECASE),
+            re.compile(r'\b(computer science|engineering|mathematics|statistics)\b', re.IGNORECASE)
+        ]
+        
+        # Precompiled frequency pattern for every fixed keyword (lowercased). Each
+        # keyword is counted on its own, so overlapping terms such as "sql" and
+        # "sql server" both see every occurrence.
+        self._frequency_patterns = {
+            kw: re.compile(rf'\b{re.escape(kw)}\b', re.IGNORECASE)
+            for kw in chain(
+                (skill for skills in self.technical_skills.values() for skill in skills),
+                self.soft_skills, self.business_terms, self.cert_keywords
+            )
+        }
+        
+        # Years-of-experience phrasings combined into a single pattern
+        self._experience_re = re.compile(
+            r'(\d+)\+?\s*years?\s+(?:of\s+)?experience'
+            r'|(\d+)\+?\s*years?\s+(?:in|with)'
+            r'|minimum\s+(\d+)\s+years?'
+            r'|at least\s+(\d+)\s+years?',
+            re.IGNORECASE
+        )
+        
         # Stop words to ignore
         self.stop_words = {
             'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
@@ -54,30 +116,38 @@ class KeywordExtractor:
         
         # Clean and normalize text
         cleaned_text = self._clean_text(text)
-        
-        # Extract different types of keywords
-        technical_keywords = self._extract_technical_skills(cleaned_text)
-        soft_keywords = self._extract_soft_skills(cleaned_text)
-        domain_keywords = self._extract_domain_keywords(cleaned_text)
-        requirement_keywords = self._extract_requirement_keywords(cleaned_text)
-        
-        # Combine all keywords
-        all_keywords = []
-        all_keywords.extend(technical_keywords)
-        all_keywords.extend(soft_keywords)
-        all_keywords.extend(domain_keywords)
-        all_keywords.extend(requirement_keywords)
-        
-        # Remove duplicates while preserving order
-        unique_keywords = []
-        seen = set()
-        for keyword in all_keywords:
-            if keyword.lower() not in seen:
-                unique_keywords.append(keyword)
-                seen.add(keyword.lower())
-        
+        return self._extract_keywords_impl(self._skills_by_category(cleaned_text), max_keywords)
+    
+    def _extract_keywords_impl(self, keywords_by_category: Dict[str, List[str]], max_keywords: int = 50) -> List[str]:
+        """Merge categorized keywords into one de-duplicated list"""
+        # Combine all keywords, removing duplicates while preserving order. Every
+        # extractor emits one canonical casing per keyword, so exact-match
+        # de-duplication is equivalent to the case-insensitive one.
+        unique_keywords = list(dict.fromkeys(chain.from_iterable(keywords_by_category.values())))
         return unique_keywords[:max_keywords]
     
+    @staticmethod
+    def _format_technical_skill(skill: str) -> str:
+        """Capitalize a technical skill properly"""
+        if skill in ['javascript', 'typescript']:
+            return skill.capitalize()
+        elif skill == 'c++':
+            return 'C++'
+        elif skill == 'c#':
+            return 'C#'
+        elif skill in ['aws', 'gcp', 'sql', 'api', 'ui', 'ux']:
+            return skill.upper()
+        return skill.title()
+    
+    @staticmethod
+    def _format_domain_term(term: str) -> str:
+        """Capitalize a business/industry term properly"""
+        if term in ['api', 'rest', 'ci/cd', 'iot']:
+            return term.upper()
+        elif term == 'ui/ux':
+            return 'UI/UX'
+        return term.title()
+    
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text for processing"""
         # Convert to lowercase
@@ -94,120 +164,70 @@ class KeywordExtractor:
     def _extract_technical_skills(self, text: str) -> List[str]:
         """Extract technical skills and technologies"""
         found_skills = []
+        append = found_skills.append
         
-        for category, skills in self.technical_skills.items():
-            for skill in skills:
-                # Look for exact matches and variations
-                patterns = [
-                    rf'\b{re.escape(skill)}\b',
-                    rf'\b{re.escape(skill)}\.js\b',  # For JavaScript frameworks
-                    rf'\b{re.escape(skill)}\+\+\b',  # For C++
-                    rf'\b{re.escape(skill)}#\b'      # For C#
-                ]
-                
-                for pattern in patterns:
-                    if re.search(pattern, text, re.IGNORECASE):
-                        # Capitalize properly
-                        if skill in ['javascript', 'typescript']:
-                            found_skills.append(skill.capitalize())
-                        elif skill == 'c++':
-                            found_skills.append('C++')
-                        elif skill == 'c#':
-                            found_skills.append('C#')
-                        elif skill in ['aws', 'gcp', 'sql', 'api', 'ui', 'ux']:
-                            found_skills.append(skill.upper())
-                        else:
-                            found_skills.append(skill.title())
-                        break
+        for name, pattern in self._technical_patterns:
+            if pattern.search(text):
+                append(name)
         
         return found_skills
     
     def _extract_soft_skills(self, text: str) -> List[str]:
         """Extract soft skills and personal qualities"""
         found_skills = []
+        append = found_skills.append
         
-        for skill in self.soft_skills:
-            if re.search(rf'\b{re.escape(skill)}\b', text, re.IGNORECASE):
-                found_skills.append(skill.title())
+        for name, pattern in self._soft_patterns:
+            if pattern.search(text):
+                append(name)
         
         return found_skills
     
     def _extract_domain_keywords(self, text: str) -> List[str]:
         """Extract domain-specific keywords and industry terms"""
         domain_keywords = []
+        append = domain_keywords.append
         
-        # Common business/industry terms
-        business_terms = [
-            'agile', 'scrum', 'kanban', 'devops', 'ci/cd', 'microservices',
-            'api', 'rest', 'graphql', 'machine learning', 'artificial intelligence',
-            'data science', 'big data', 'analytics', 'business intelligence',
-            'cybersecurity', 'blockchain', 'iot', 'mobile development',
-            'web development', 'full stack', 'frontend', 'backend', 'ui/ux'
-        ]
-        
-        for term in business_terms:
-            if re.search(rf'\b{re.escape(term)}\b', text, re.IGNORECASE):
-                # Proper capitalization
-                if term in ['api', 'rest', 'ci/cd', 'iot']:
-                    domain_keywords.append(term.upper())
-                elif term == 'ui/ux':
-                    domain_keywords.append('UI/UX')
-                else:
-                    domain_keywords.append(term.title())
+        for name, pattern in self._domain_patterns:
+            if pattern.search(text):
+                append(name)
         
         return domain_keywords
     
     def _extract_requirement_keywords(self, text: str) -> List[str]:
         """Extract keywords from requirement sections"""
         requirement_keywords = []
+        append = requirement_keywords.append
         
-        # Look for years of experience patterns
-        experience_patterns = [
-            r'(\d+)\+?\s*years?\s+(?:of\s+)?experience',
-            r'(\d+)\+?\s*years?\s+(?:in|with)',
-            r'minimum\s+(\d+)\s+years?',
-            r'at least\s+(\d+)\s+years?'
-        ]
-        
-        for pattern in experience_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                requirement_keywords.append(f"{match}+ years experience")
+        # Look for years of experience patterns (one capture group per phrasing)
+        requirement_keywords.extend(dict.fromkeys(
+            f"{next(filter(None, match))}+ years experience"
+            for match in self._experience_re.findall(text)
+        ))
         
         # Look for degree requirements
-        degree_patterns = [
-            r'\b(bachelor\'?s?|master\'?s?|phd|doctorate)\s+(?:degree\s+)?(?:in\s+)?(\w+)',
-            r'\b(bs|ms|ba|ma)\s+(?:in\s+)?(\w+)',
-            r'\b(computer science|engineering|mathematics|statistics)\b'
-        ]
-        
-        for pattern in degree_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in self._degree_patterns:
+            for match in pattern.findall(text):
                 if isinstance(match, tuple):
                     degree_text = ' '.join(match).strip()
                 else:
                     degree_text = match
                 if degree_text:
-                    requirement_keywords.append(degree_text.title())
+                    append(degree_text.title())
         
         # Look for certification keywords
-        cert_keywords = [
-            'certification', 'certified', 'license', 'licensed', 'aws certified',
-            'microsoft certified', 'google certified', 'cisco certified',
-            'pmp', 'cissp', 'cisa', 'cism'
-        ]
-        
-        for keyword in cert_keywords:
-            if re.search(rf'\b{re.escape(keyword)}\b', text, re.IGNORECASE):
-                requirement_keywords.append(keyword.title())
+        for name, pattern in self._cert_patterns:
+            if pattern.search(text):
+                append(name)
         
         return requirement_keywords
     
     def extract_skills_by_category(self, text: str) -> Dict[str, List[str]]:
         """Extract skills organized by category"""
-        cleaned_text = self._clean_text(text)
-        
+        return self._skills_by_category(self._clean_text(text))
+    
+    def _skills_by_category(self, cleaned_text: str) -> Dict[str, List[str]]:
+        """Run every extractor over already-cleaned text"""
         return {
             'technical_skills': self._extract_technical_skills(cleaned_text),
             'soft_skills': self._extract_soft_skills(cleaned_text),
@@ -217,12 +237,23 @@ class KeywordExtractor:
     
     def get_keyword_frequency(self, text: str) -> Dict[str, int]:
         """Get frequency count of keywords in text"""
-        keywords = self.extract_keywords(text)
-        cleaned_text = self._clean_text(text)
+        if not text:
+            return {}
         
+        # Clean once and share the text between extraction and counting
+        cleaned_text = self._clean_text(text)
+        keywords = self._extract_keywords_impl(self._skills_by_category(cleaned_text))
+        return self._keyword_frequency(cleaned_text, keywords)
+    
+    def _keyword_frequency(self, cleaned_text: str, keywords: List[str]) -> Dict[str, int]:
+        """Count occurrences of each keyword in already-cleaned text"""
         frequency = {}
         for keyword in keywords:
-            count = len(re.findall(rf'\b{re.escape(keyword)}\b', cleaned_text, re.IGNORECASE))
-            frequency[keyword] = count
+            pattern = self._frequency_patterns.get(keyword.lower())
+            if pattern is not None:
+                frequency[keyword] = len(pattern.findall(cleaned_text))
+            else:
+                # Requirement phrases (years, degrees) are not part of the fixed vocabulary
+                frequency[keyword] = len(re.findall(rf'\b{re.escape(keyword)}\b', cleaned_text, re.IGNORECASE))
         
         return frequency
@@ -0,0 +1,25 @@
+# Single-pass escape table for LaTeX special characters in raw user text
+LATEX_TRANS = str.maketrans({
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '^': r'\textasciicircum{}',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '\\': r'\textbackslash{}'
+})
+
+LATEX_SPECIAL_CHARS = frozenset('&%$#^_{}~\\')
+
+
+def escape_latex(text: str) -> str:
+    """Escape special LaTeX characters"""
+    if not text:
+        return ""
+    # Most fields (names, dates, skills) contain nothing to escape
+    if LATEX_SPECIAL_CHARS.isdisjoint(text):
+        return text
+    return text.translate(LATEX_TRANS)
@@ -1,8 +1,83 @@
 import re
+from string import Template
 from typing import Dict, List, Any
 from .openai_latex import OpenAILaTeXGenerator
+from .latex_escape import escape_latex
 import logging
 
+# Contact-info patterns, compiled once at import
+_EMAIL_RE = re.compile(r'\b[\w.%+-]+@[\w.-]+\.[A-Za-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.\s]?\d{4}')
+_LINKEDIN_RE = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+_GITHUB_RE = re.compile(r'github\.com/[\w-]+', re.IGNORECASE)
+_HAS_DIGIT = re.compile(r'\d').search
+
+# Skill list delimiters mapped to newlines for a single splitlines() pass
+_DELIM_TRANS = str.maketrans({',': '\n', ';': '\n', '•': '\n', '-': '\n'})
+
+# Static LaTeX template parts, built once at import
+_BASIC_TEMPLATE = Template(r"""\documentclass[11pt,a4paper,sans]{moderncv}
+\moderncvstyle{classic}
+\moderncvcolor{blue}
+
+\usepackage[scale=0.75]{geometry}
+
+% Personal data
+\name{Professional}{Resume}
+
+\begin{document}
+
+\makecvtitle
+
+\section{Content}
+\cvitem{}{
+$content
+}
+
+\end{document}""")
+
+_MODERN_HEADER = r"""
+\documentclass[11pt,a4paper,sans]{moderncv}
+
+% Modern CV theme
+\moderncvstyle{banking}
+\moderncvcolor{blue}
+
+% Character encoding
+\usepackage[utf8]{inputenc}
+
+% Adjust page margins
+\usepackage[scale=0.75]{geometry}
+
+% Personal data
+"""
+
+_MODERN_BEGIN_DOCUMENT = r"""
+\begin{document}
+\makecvtitle
+
+"""
+
+_MODERN_FOOTER = r"""
+\end{document}
+"""
+
+_CLASSIC_HEADER = r"""
+\documentclass[11pt,letterpaper]{article}
+\usepackage[utf8]{inputenc}
+\usepackage[margin=0.75in]{geometry}
+\usepackage{enumitem}
+\usepackage{titlesec}
+
+% Custom formatting
+\titleformat{\section}{\large\bfseries}{\thesection}{1em}{}[\titlerule]
+\titleformat{\subsection}{\normalsize\bfseries}{\thesubsection}{1em}{}
+
+\begin{document}
+
+% Header
+"""
+
 class LaTeXGenerator:
     """Service for generating LaTeX source from resume data"""
     
@@ -25,25 +100,7 @@ class LaTeXGenerator:
     
     def _generate_basic_latex(self, resume_text: str) -> str:
         """Fallback basic LaTeX template"""
-        return f"""\\documentclass[11pt,a4paper,sans]{{moderncv}}
-\\moderncvstyle{{classic}}
-\\moderncvcolor{{blue}}
-
-\\usepackage[scale=0.75]{{geometry}}
-
-% Personal data
-\\name{{Professional}}{{Resume}}
-
-\\begin{{document}}
-
-\\makecvtitle
-
-\\section{{Content}}
-\\cvitem{{}}{{
-{resume_text[:1000]}
-}}
-
-\\end{{document}}"""
+        return _BASIC_TEMPLATE.substitute(content=resume_text[:1000])
     
     def _parse_resume_sections(self, text: str) -> Dict[str, any]:
         """Parse resume text into structured sections"""
@@ -63,7 +120,7 @@ class LaTeXGenerator:
         lines = text.split('\n')
         for line in lines[:5]:  # Check first 5 lines for name
             line = line.strip()
-            if line and len(line.split()) <= 4 and not '@' in line and not any(char.isdigit() for char in line):
+            if line and len(line.split()) <= 4 and '@' not in line and not _HAS_DIGIT(line):
                 sections['name'] = line
                 break
         
@@ -119,28 +176,22 @@ class LaTeXGenerator:
         contact = {}
         
         # Email
-        email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
+        email_match = _EMAIL_RE.search(text)
         if email_match:
             contact['email'] = email_match.group()
         
-        # Phone
-        phone_patterns = [
-            r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',
-            r'\(\d{3}\)\s*\d{3}[-.\s]?\d{4}'
-        ]
-        for pattern in phone_patterns:
-            phone_match = re.search(pattern, text)
-            if phone_match:
-                contact['phone'] = phone_match.group()
-                break
+        # Phone (both formats in a single scan)
+        phone_match = _PHONE_RE.search(text)
+        if phone_match:
+            contact['phone'] = phone_match.group()
         
         # LinkedIn
-        linkedin_match = re.search(r'linkedin\.com/in/[\w-]+', text.lower())
+        linkedin_match = _LINKEDIN_RE.search(text)
         if linkedin_match:
             contact['linkedin'] = linkedin_match.group()
         
         # GitHub
-        github_match = re.search(r'github\.com/[\w-]+', text.lower())
+        github_match = _GITHUB_RE.search(text)
         if github_match:
             contact['github'] = github_match.group()
         
@@ -198,111 +249,69 @@ class LaTeXGenerator:
     
     def _parse_skills_section(self, content: List[str]) -> List[str]:
         """Parse skills section"""
-        skills = []
-        for line in content:
-            # Split by common delimiters
-            line_skills = re.split(r'[,;•\-\n]', line)
-            for skill in line_skills:
-                skill = skill.strip()
-                if skill and len(skill) > 1:
-                    skills.append(skill)
-        return skills
+        # Split by common delimiters
+        raw = '\n'.join(content).translate(_DELIM_TRANS)
+        return [skill for skill in (s.strip() for s in raw.splitlines()) if len(skill) > 1]
     
     def _generate_modern_template(self, sections: Dict[str, any]) -> str:
         """Generate modern LaTeX template"""
-        latex_content = r"""
-\documentclass[11pt,a4paper,sans]{moderncv}
-
-% Modern CV theme
-\moderncvstyle{banking}
-\moderncvcolor{blue}
-
-% Character encoding
-\usepackage[utf8]{inputenc}
-
-% Adjust page margins
-\usepackage[scale=0.75]{geometry}
-
-% Personal data
-""" + f"\\name{{{self._escape_latex(sections.get('name', 'Your Name'))}}}{{}}\n"
+        parts = [_MODERN_HEADER, f"\\name{{{self._escape_latex(sections.get('name', 'Your Name'))}}}{{}}\n"]
+        append = parts.append
 
         # Add contact information
         contact = sections.get('contact', {})
         if contact.get('phone'):
-            latex_content += f"\\phone[mobile]{{{contact['phone']}}}\n"
+            append(f"\\phone[mobile]{{{contact['phone']}}}\n")
         if contact.get('email'):
-            latex_content += f"\\email{{{contact['email']}}}\n"
+            append(f"\\email{{{contact['email']}}}\n")
         if contact.get('linkedin'):
-            latex_content += f"\\social[linkedin]{{{contact['linkedin']}}}\n"
+            append(f"\\social[linkedin]{{{contact['linkedin']}}}\n")
         if contact.get('github'):
-            latex_content += f"\\social[github]{{{contact['github']}}}\n"
-
-        latex_content += r"""
-\begin{document}
-\makecvtitle
+            append(f"\\social[github]{{{contact['github']}}}\n")
 
-"""
+        append(_MODERN_BEGIN_DOCUMENT)
 
         # Add summary/objective
         if sections.get('summary'):
-            latex_content += "\\section{Professional Summary}\n"
-            latex_content += f"{self._escape_latex(sections['summary'])}\n\n"
+            append("\\section{Professional Summary}\n")
+            append(f"{self._escape_latex(sections['summary'])}\n\n")
 
         # Add experience
         if sections.get('experience'):
-            latex_content += "\\section{Professional Experience}\n"
-            for exp in sections['experience']:
-                latex_content += f"\\cventry{{}}{{{self._escape_latex(exp['title'])}}}{{}}{{}}{{}}{{\n"
-                for detail in exp.get('details', []):
-                    latex_content += f"\\item {self._escape_latex(detail)}\n"
-                latex_content += "}\n"
+            append("\\section{Professional Experience}\n")
+            self._append_cventries(parts, sections['experience'])
 
         # Add education
         if sections.get('education'):
-            latex_content += "\\section{Education}\n"
-            for edu in sections['education']:
-                latex_content += f"\\cventry{{}}{{{self._escape_latex(edu['title'])}}}{{}}{{}}{{}}{{\n"
-                for detail in edu.get('details', []):
-                    latex_content += f"\\item {self._escape_latex(detail)}\n"
-                latex_content += "}\n"
+            append("\\section{Education}\n")
+            self._append_cventries(parts, sections['education'])
 
         # Add skills
         if sections.get('skills'):
-            latex_content += "\\section{Technical Skills}\n"
+            append("\\section{Technical Skills}\n")
             skills_text = ", ".join(sections['skills'][:15])  # Limit to 15 skills
-            latex_content += f"\\cvitem{{}}{{\\textbf{{{self._escape_latex(skills_text)}}}}}\n\n"
+            append(f"\\cvitem{{}}{{\\textbf{{{self._escape_latex(skills_text)}}}}}\n\n")
 
         # Add projects
         if sections.get('projects'):
-            latex_content += "\\section{Key Projects}\n"
-            for proj in sections['projects']:
-                latex_content += f"\\cventry{{}}{{{self._escape_latex(proj['title'])}}}{{}}{{}}{{}}{{\n"
-                for detail in proj.get('details', []):
-                    latex_content += f"\\item {self._escape_latex(detail)}\n"
-                latex_content += "}\n"
-
-        latex_content += r"""
-\end{document}
-"""
-        return latex_content
+            append("\\section{Key Projects}\n")
+            self._append_cventries(parts, sections['projects'])
+
+        append(_MODERN_FOOTER)
+        return ''.join(parts)
+    
+    def _append_cventries(self, parts: List[str], items: List[Dict[str, Any]]) -> None:
+        """Append one \\cventry block per structured item"""
+        for item in items:
+            parts.append(f"\\cventry{{}}{{{self._escape_latex(item['title'])}}}{{}}{{}}{{}}{{\n")
+            for detail in item.get('details', []):
+                parts.append(f"\\item {self._escape_latex(detail)}\n")
+            parts.append("}\n")
     
     def _generate_classic_template(self, sections: Dict[str, any]) -> str:
         """Generate classic LaTeX template"""
-        latex_content = r"""
-\documentclass[11pt,letterpaper]{article}
-\usepackage[utf8]{inputenc}
-\usepackage[margin=0.75in]{geometry}
-\usepackage{enumitem}
-\usepackage{titlesec}
-
-% Custom formatting
-\titleformat{\section}{\large\bfseries}{\thesection}{1em}{}[\titlerule]
-\titleformat{\subsection}{\normalsize\bfseries}{\thesubsection}{1em}{}
-
-\begin{document}
-
-% Header
-""" + f"\\begin{{center}}\n\\textbf{{\\Large {self._escape_latex(sections.get('name', 'Your Name'))}}}\\\\\n"
+        parts = [_CLASSIC_HEADER, f"\\begin{{center}}\n\\textbf{{\\Large {self._escape_latex(sections.get('name', 'Your Name'))}}}\\\\\n"]
+        append = parts.append
 
         # Add contact in header
         contact = sections.get('contact', {})
@@ -315,47 +324,27 @@ class LaTeXGenerator:
             contact_parts.append(contact['linkedin'])
         
         if contact_parts:
-            latex_content += " | ".join(contact_parts) + "\\\\\n"
+            append(" | ".join(contact_parts) + "\\\\\n")
 
-        latex_content += "\\end{center}\n\n"
+        append("\\end{center}\n\n")
 
         # Add sections similar to modern template but with classic formatting
         if sections.get('summary'):
-            latex_content += "\\section*{Professional Summary}\n"
-            latex_content += f"{self._escape_latex(sections['summary'])}\n\n"
+            append("\\section*{Professional Summary}\n")
+            append(f"{self._escape_latex(sections['summary'])}\n\n")
 
         if sections.get('experience'):
-            latex_content += "\\section*{Professional Experience}\n"
+            append("\\section*{Professional Experience}\n")
             for exp in sections['experience']:
-                latex_content += f"\\subsection*{{{self._escape_latex(exp['title'])}}}\n"
-                latex_content += "\\begin{itemize}[leftmargin=*]\n"
+                append(f"\\subsection*{{{self._escape_latex(exp['title'])}}}\n")
+                append("\\begin{itemize}[leftmargin=*]\n")
                 for detail in exp.get('details', []):
-                    latex_content += f"\\item {self._escape_latex(detail)}\n"
-                latex_content += "\\end{itemize}\n\n"
+                    append(f"\\item {self._escape_latex(detail)}\n")
+                append("\\end{itemize}\n\n")
 
-        latex_content += "\\end{document}\n"
-        return latex_content
+        append("\\end{document}\n")
+        return ''.join(parts)
     
     def _escape_latex(self, text: str) -> str:
         """Escape special LaTeX characters"""
-        if not text:
-            return ""
-        
-        # Dictionary of LaTeX special characters and their escaped versions
-        latex_special_chars = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '^': r'\textasciicircum{}',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '\\': r'\textbackslash{}'
-        }
-        
-        for char, escaped in latex_special_chars.items():
-            text = text.replace(char, escaped)
-        
-        return text
+        return escape_latex(text)
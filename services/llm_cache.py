@@ -0,0 +1,178 @@
+import os
+import json
+import asyncio
+import time
+import shelve
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Optional dependency: redis (shared cache across workers)
+try:
+    import redis
+except Exception:  # pragma: no cover
+    redis = None
+
+
+class LLMCache:
+    """Deterministic cache for chat completion responses.
+
+    Responses are keyed by a sha256 of (model, messages, temperature, tools) and stored
+    in Redis when REDIS_URL is configured, otherwise in a local shelve file.
+    Sampling at high temperature is intentionally never cached.
+    
+    get_or_call/aget_or_call also coalesce concurrent identical requests (at any
+    temperature) so a burst of cache misses for the same prompt makes one API call.
+    """
+
+    MAX_CACHEABLE_TEMPERATURE = 0.5
+
+    def __init__(self, backend: Optional[str] = None, ttl: int = 86400):
+        self.ttl = ttl
+        self._redis_url = backend if backend is not None else os.environ.get('REDIS_URL')
+        self._shelve_path = os.environ.get(
+            'LLM_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'ai_resume_llm_cache')
+        )
+        self._redis = None
+        self._fallback_warned = False
+        self._lock = threading.Lock()
+        # In-flight requests by key; concurrent.futures so sync threads and any event loop can wait on them
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    def key(self, model: str, messages: List[Dict[str, Any]], temperature: float,
+            tools: Optional[List[Dict[str, Any]]] = None,
+            response_format: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Build the cache key, or None if the request should not be cached"""
+        if temperature > self.MAX_CACHEABLE_TEMPERATURE:
+            return None
+        return self._request_key(model, messages, temperature, tools, response_format)
+    
+    def _request_key(self, model: str, messages: List[Dict[str, Any]], temperature: float,
+                     tools: Optional[List[Dict[str, Any]]] = None,
+                     response_format: Optional[Dict[str, Any]] = None) -> str:
+        payload = json.dumps(
+            {'model': model, 'messages': messages, 'temperature': temperature, 'tools': tools,
+             'response_format': response_format},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_or_call(self, call: Callable[[], Dict[str, Any]], model: str, messages: List[Dict[str, Any]],
+                    temperature: float, tools: Optional[List[Dict[str, Any]]] = None,
+                    response_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Return the cached response, or run call() once for all concurrent identical requests"""
+        request_key = self._request_key(model, messages, temperature, tools, response_format)
+        cache_key = request_key if temperature <= self.MAX_CACHEABLE_TEMPERATURE else None
+        cached = self.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        future, owner = self._claim(request_key)
+        if not owner:
+            return future.result()
+        try:
+            value = call()
+        except BaseException as e:
+            self._release(request_key, future, error=e)
+            raise
+        self.set(cache_key, value)
+        self._release(request_key, future, value=value)
+        return value
+    
+    async def aget_or_call(self, call: Callable[[], Awaitable[Dict[str, Any]]], model: str,
+                           messages: List[Dict[str, Any]], temperature: float,
+                           tools: Optional[List[Dict[str, Any]]] = None,
+                           response_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Async get_or_call; call is a coroutine function"""
+        request_key = self._request_key(model, messages, temperature, tools, response_format)
+        cache_key = request_key if temperature <= self.MAX_CACHEABLE_TEMPERATURE else None
+        cached = self.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        future, owner = self._claim(request_key)
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            value = await call()
+        except BaseException as e:
+            self._release(request_key, future, error=e)
+            raise
+        self.set(cache_key, value)
+        self._release(request_key, future, value=value)
+        return value
+    
+    def known(self, model: str, messages: List[Dict[str, Any]], temperature: float,
+              tools: Optional[List[Dict[str, Any]]] = None,
+              response_format: Optional[Dict[str, Any]] = None) -> bool:
+        """True if the response is cached or an identical request is already in flight"""
+        request_key = self._request_key(model, messages, temperature, tools, response_format)
+        with self._inflight_lock:
+            if request_key in self._inflight:
+                return True
+        return self.get(self.key(model, messages, temperature, tools, response_format)) is not None
+    
+    def _claim(self, request_key: str):
+        """Return (future, True) if this caller must make the request, else the in-flight future"""
+        with self._inflight_lock:
+            future = self._inflight.get(request_key)
+            if future is not None:
+                return future, False
+            future = self._inflight[request_key] = Future()
+            return future, True
+    
+    def _release(self, request_key: str, future: Future, value=None, error: Optional[BaseException] = None) -> None:
+        with self._inflight_lock:
+            self._inflight.pop(request_key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+    
+    def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not key:
+            return None
+        try:
+            client = self._get_redis()
+            if client is not None:
+                raw = client.get(f"llm:{key}")
+                return json.loads(raw) if raw else None
+            with self._lock, shelve.open(self._shelve_path) as db:
+                entry = db.get(key)
+            if not entry:
+                return None
+            expires_at, value = entry
+            return value if expires_at > time.time() else None
+        except Exception:
+            return None
+
+    def set(self, key: Optional[str], value: Dict[str, Any]) -> None:
+        if not key:
+            return
+        try:
+            client = self._get_redis()
+            if client is not None:
+                client.setex(f"llm:{key}", self.ttl, json.dumps(value))
+                return
+            with self._lock, shelve.open(self._shelve_path) as db:
+                db[key] = (time.time() + self.ttl, value)
+        except Exception:
+            pass  # Caching is best effort
+
+    def _get_redis(self):
+        if self._redis is None and redis is not None and self._redis_url:
+            self._redis = redis.Redis.from_url(self._redis_url)
+        if self._redis is None and not self._fallback_warned:
+            self._fallback_warned = True
+            reason = "redis is not installed" if self._redis_url else "REDIS_URL is not set"
+            logging.warning(f"LLM cache using local shelve file {self._shelve_path} ({reason}); "
+                            f"it is not shared across hosts")
+        return self._redis
+
+
+# Shared cache instance
+llm_cache = LLMCache()
@@ -1,237 +1,335 @@
 import os
+import asyncio
+from string import Template
 from typing import Dict, List, Optional
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from pydantic import BaseModel, ConfigDict, Field
+from services.llm_cache import llm_cache
+from services.jd_compress import compress
+from services._async_loop import run_sync
+from services._openai_client import get_async_client, on_client_loop, openai_retry
+
+
+class EmailOut(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    subject: str = Field(description="Compelling, specific email subject line")
+    body: str = Field(description="150-200 word email: greeting, interest in the role, 2-3 matching qualifications, "
+                                  "mention of the attached resume, closing call-to-action")
+
+
+class LinkedInOut(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    connection_request: str = Field(description="Connection request, 50 words max, with a soft conversation starter")
+    followup: str = Field(description="Follow-up message after connecting (100-150 words)")
+
+
+class AllMessagesOut(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    email: EmailOut
+    linkedin: LinkedInOut
+    pitch: str = Field(description="Spoken elevator pitch (100-150 words)")
+
+
+def _json_schema_format(name: str, model) -> Dict:
+    """Build a strict structured-output response_format from a Pydantic model"""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "schema": model.model_json_schema(), "strict": True}
+    }
+
+
+_EMAIL_FORMAT = _json_schema_format("email", EmailOut)
+_LINKEDIN_FORMAT = _json_schema_format("linkedin", LinkedInOut)
+_ALL_MESSAGES_FORMAT = _json_schema_format("outreach_messages", AllMessagesOut)
+
+# Prompt templates are built once; per call only the $slots are substituted.
+# System prompts carry persona and voice only; structure and length come from the
+# JSON schemas above and the per-type max_tokens caps.
+_EMAIL_SYSTEM_TMPL = Template("You write concise, personalized job-application emails in a $tone voice. Return JSON.")
+
+_EMAIL_USER_TMPL = Template("""\
+Job Title: $job_title
+Company: $company
+Applicant Name: $user_name
+
+Job Description (key points):
+$job_description
+""")
+
+_LINKEDIN_SYSTEM_TMPL = Template("You write short, authentic LinkedIn networking messages in a $tone voice, never salesy. Return JSON.")
+
+_LINKEDIN_USER_TMPL = Template("""\
+Job Title: $job_title
+Company: $company
+Sender: $user_name
+
+Job Description highlights:
+$job_description
+""")
+
+_PITCH_SYSTEM_TMPL = Template(
+    "You write spoken 30-60 second elevator pitches for job seekers in a $tone voice: "
+    "hook, skills, target role, value, closing question."
+)
+
+_PITCH_USER_TMPL = Template("""\
+Target Job: $job_title
+Target Company: $company
+Speaker: $user_name
+
+Job Requirements/Description:
+$job_description
+""")
+
+_ALL_SYSTEM_TMPL = Template(
+    "You write job-seeker outreach (application email, LinkedIn messages, elevator pitch) "
+    "in a $tone voice, specific to the role. Return JSON."
+)
+
+_ALL_USER_TMPL = Template("""\
+Job Title: $job_title
+Company: $company
+Applicant Name: $user_name
+
+Job Description (key points):
+$job_description
+""")
 
 class MessageGenerator:
     """Service for generating personalized outreach messages"""
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0.7,
-            openai_api_key=os.environ.get('OPENAI_API_KEY')
-        )
+        self.aclient = get_async_client()
+        # Short-form outputs are routed to a small, fast model; override per type via env
+        self.models = {
+            "email": os.environ.get('OPENAI_MODEL_EMAIL', 'gpt-4o-mini'),
+            "linkedin": os.environ.get('OPENAI_MODEL_LINKEDIN', 'gpt-4o-mini'),
+            "pitch": os.environ.get('OPENAI_MODEL_PITCH', 'gpt-4o-mini'),
+            "all": os.environ.get('OPENAI_MODEL_ALL', 'gpt-4o-mini')
+        }
+        self.temperature = 0.7
+        # Output caps: each type's word budget plus JSON keys/escaping, with ~1.5x headroom.
+        # A response that still hits the cap is retried once with double the room.
+        self.max_tokens = {
+            "email": 600,
+            "linkedin": 450,
+            "pitch": 350
+        }
+        self.max_tokens["all"] = sum(self.max_tokens.values())
+        self.cache = llm_cache
     
     def generate_message(self, job_description: str, company: str, job_title: str, 
                         message_type: str, tone: str = "professional", 
                         user_name: str = "") -> Dict[str, str]:
+        """Generate outreach message based on job details (blocking wrapper)"""
+        # Runs on the shared client loop rather than spinning up a new loop per call,
+        # so it is also safe to call from threads that already run an event loop
+        return run_sync(self.agenerate_message(
+            job_description, company, job_title, message_type, tone, user_name
+        ))
+    
+    async def agenerate_message(self, job_description: str, company: str, job_title: str, 
+                                message_type: str, tone: str = "professional", 
+                                user_name: str = "") -> Dict[str, str]:
         """Generate outreach message based on job details"""
         
         if message_type == "email":
-            return self._generate_email(job_description, company, job_title, tone, user_name)
+            return await self._generate_email(job_description, company, job_title, tone, user_name)
         elif message_type == "linkedin":
-            return self._generate_linkedin_message(job_description, company, job_title, tone, user_name)
+            return await self._generate_linkedin_message(job_description, company, job_title, tone, user_name)
         elif message_type == "pitch":
-            return self._generate_elevator_pitch(job_description, company, job_title, tone, user_name)
+            return await self._generate_elevator_pitch(job_description, company, job_title, tone, user_name)
         else:
             raise ValueError(f"Unsupported message type: {message_type}")
     
-    def _generate_email(self, job_description: str, company: str, job_title: str, 
-                       tone: str, user_name: str) -> Dict[str, str]:
-        """Generate professional email to hiring manager"""
+    async def generate_all(self, job_description: str, company: str, job_title: str, 
+                           tone: str = "professional", user_name: str = "") -> Dict[str, Dict[str, str]]:
+        """Generate email, LinkedIn message and elevator pitch concurrently"""
+        email, linkedin, pitch = await asyncio.gather(
+            self._generate_email(job_description, company, job_title, tone, user_name),
+            self._generate_linkedin_message(job_description, company, job_title, tone, user_name),
+            self._generate_elevator_pitch(job_description, company, job_title, tone, user_name)
+        )
+        return {'email': email, 'linkedin': linkedin, 'pitch': pitch}
+    
+    def generate_all_messages(self, job_description: str, company: str, job_title: str, 
+                              tone: str = "professional", user_name: str = "") -> Dict[str, Dict[str, str]]:
+        """Generate email, LinkedIn message and elevator pitch in one call (blocking wrapper)"""
+        return run_sync(self.agenerate_all_messages(
+            job_description, company, job_title, tone, user_name
+        ))
+    
+    async def agenerate_all_messages(self, job_description: str, company: str, job_title: str, 
+                                     tone: str = "professional", user_name: str = "") -> Dict[str, Dict[str, str]]:
+        """Generate all three messages from a single prompt that carries the job context once"""
         
-        system_prompt = f"""
-        You are an expert at writing professional, personalized outreach emails for job applications.
-        Create an email that is {tone}, engaging, and shows genuine interest in the role.
+        system_prompt = _ALL_SYSTEM_TMPL.substitute(tone=tone)
         
-        Guidelines:
-        - Keep it concise (150-200 words)
-        - Show you've researched the company and role
-        - Highlight relevant skills without being pushy
-        - Include a clear call-to-action
-        - Use proper email formatting
-        """
+        human_prompt = _ALL_USER_TMPL.substitute(
+            job_title=job_title,
+            company=company,
+            user_name=user_name or "the applicant",
+            job_description=compress(job_description)
+        )
         
-        human_prompt = f"""
-        Write a professional email for a job application with these details:
+        try:
+            content = await self._complete("all", system_prompt, human_prompt, _ALL_MESSAGES_FORMAT)
+            parsed = AllMessagesOut.model_validate_json(content)
+        except Exception as e:
+            # Fused call failed; fall back to independent per-type generation
+            return await self.generate_all(job_description, company, job_title, tone, user_name)
         
-        Job Title: {job_title}
-        Company: {company}
-        Applicant Name: {user_name or "the applicant"}
-        Tone: {tone}
+        return {
+            'email': self._email_result(parsed.email, job_title, company),
+            'linkedin': self._linkedin_result(parsed.linkedin, job_title),
+            'pitch': self._pitch_result(parsed.pitch.strip(), job_title)
+        }
+    
+    @openai_retry
+    async def _call_openai(self, **kwargs):
+        """Chat completion with retry; the pooled client lives on its own loop so hop there"""
+        return await on_client_loop(self.aclient.chat.completions.create(**kwargs))
+    
+    async def _complete(self, message_type: str, system_prompt: str, human_prompt: str,
+                        response_format: Optional[Dict] = None) -> str:
+        """Run a single chat completion with the model for message_type and return the stripped text"""
+        model = self.models[message_type]
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": human_prompt}
+        ]
+        extra = {"response_format": response_format} if response_format else {}
         
-        Job Description (key points):
-        {job_description[:1000]}  # Limit to avoid token limits
+        async def call():
+            max_tokens = self.max_tokens[message_type]
+            for attempt in range(2):
+                response = await self._call_openai(
+                    model=model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    **extra
+                )
+                # Truncated JSON never parses, so give it more room rather than fail
+                if not response.choices or response.choices[0].finish_reason != "length":
+                    return response.model_dump()
+                max_tokens *= 2
+            # Raise instead of returning so the truncated output is not cached
+            raise ValueError(f"{message_type} message exceeded {max_tokens // 2} tokens")
         
-        Include:
-        1. Compelling subject line
-        2. Professional greeting
-        3. Brief introduction and interest statement
-        4. 2-3 key qualifications that match the role
-        5. Mention of attached resume
-        6. Professional closing with call-to-action
+        # Identical concurrent requests share one call; only low-temperature responses are cached
+        result = await self.cache.aget_or_call(
+            call, model, messages, self.temperature, response_format=response_format
+        )
+        return (result['choices'][0]['message']['content'] or "").strip()
+    
+    async def _generate_email(self, job_description: str, company: str, job_title: str, 
+                       tone: str, user_name: str) -> Dict[str, str]:
+        """Generate professional email to hiring manager"""
         
-        Format as:
-        Subject: [subject line]
+        system_prompt = _EMAIL_SYSTEM_TMPL.substitute(tone=tone)
         
-        [email body]
-        """
+        human_prompt = _EMAIL_USER_TMPL.substitute(
+            job_title=job_title,
+            company=company,
+            user_name=user_name or "the applicant",
+            job_description=compress(job_description)
+        )
         
         try:
-            response = self.llm([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=human_prompt)
-            ])
-            
-            # Parse subject and body
-            content = response.content.strip()
-            lines = content.split('\n')
-            
-            subject = ""
-            body = ""
-            
-            for i, line in enumerate(lines):
-                if line.startswith("Subject:"):
-                    subject = line.replace("Subject:", "").strip()
-                    body = '\n'.join(lines[i+1:]).strip()
-                    break
-            
-            if not subject:
-                # Fallback if format is different
-                subject = f"Application for {job_title} Position at {company}"
-                body = content
-            
-            return {
-                'subject': subject,
-                'content': body,
-                'tips': [
-                    "Research the hiring manager's name if possible",
-                    "Send during business hours (9 AM - 5 PM)",
-                    "Follow up after 1-2 weeks if no response",
-                    "Keep attachments under 5MB"
-                ]
-            }
+            content = await self._complete("email", system_prompt, human_prompt, _EMAIL_FORMAT)
+            return self._email_result(EmailOut.model_validate_json(content), job_title, company)
             
         except Exception as e:
             return self._generate_fallback_email(job_title, company, user_name)
     
-    def _generate_linkedin_message(self, job_description: str, company: str, 
+    async def _generate_linkedin_message(self, job_description: str, company: str, 
                                   job_title: str, tone: str, user_name: str) -> Dict[str, str]:
         """Generate LinkedIn connection/message"""
         
-        system_prompt = f"""
-        You are an expert at writing engaging LinkedIn messages for professional networking.
-        Create a message that is {tone}, concise, and builds genuine connection.
-        
-        Guidelines:
-        - Keep it very short (50-100 words for connection request, 100-150 for message)
-        - Be personable and authentic
-        - Show genuine interest in their work/company
-        - Avoid being too salesy
-        - Include a soft ask or conversation starter
-        """
-        
-        human_prompt = f"""
-        Write a LinkedIn message for networking about this job opportunity:
-        
-        Job Title: {job_title}
-        Company: {company}
-        Sender: {user_name or "the job seeker"}
-        Tone: {tone}
-        
-        Job Description highlights:
-        {job_description[:800]}
+        system_prompt = _LINKEDIN_SYSTEM_TMPL.substitute(tone=tone)
         
-        Create both:
-        1. Connection request message (50 words max)
-        2. Follow-up message after connection (100-150 words)
-        
-        Format as:
-        Connection Request:
-        [message]
-        
-        Follow-up Message:
-        [message]
-        """
+        human_prompt = _LINKEDIN_USER_TMPL.substitute(
+            job_title=job_title,
+            company=company,
+            user_name=user_name or "the job seeker",
+            job_description=compress(job_description, 300)
+        )
         
         try:
-            response = self.llm([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=human_prompt)
-            ])
-            
-            content = response.content.strip()
-            
-            # Parse connection request and follow-up
-            parts = content.split("Follow-up Message:")
-            connection_msg = parts[0].replace("Connection Request:", "").strip()
-            followup_msg = parts[1].strip() if len(parts) > 1 else ""
-            
-            full_message = f"Connection Request:\n{connection_msg}\n\nFollow-up Message:\n{followup_msg}"
-            
-            return {
-                'subject': f"Connection Request - {job_title} Opportunity",
-                'content': full_message,
-                'tips': [
-                    "Personalize with something from their profile",
-                    "Connect on Tuesday-Thursday for best response rates",
-                    "Don't pitch immediately after connecting",
-                    "Engage with their posts before reaching out"
-                ]
-            }
+            content = await self._complete("linkedin", system_prompt, human_prompt, _LINKEDIN_FORMAT)
+            return self._linkedin_result(LinkedInOut.model_validate_json(content), job_title)
             
         except Exception as e:
             return self._generate_fallback_linkedin(job_title, company, user_name)
     
-    def _generate_elevator_pitch(self, job_description: str, company: str, 
+    async def _generate_elevator_pitch(self, job_description: str, company: str, 
                                job_title: str, tone: str, user_name: str) -> Dict[str, str]:
         """Generate elevator pitch for networking events"""
         
-        system_prompt = f"""
-        You are an expert at crafting compelling elevator pitches for job seekers.
-        Create a pitch that is {tone}, memorable, and clearly communicates value.
-        
-        Guidelines:
-        - 30-60 seconds when spoken (100-150 words)
-        - Start with a hook or interesting fact
-        - Clearly state what you do and what you're looking for
-        - Include specific skills/achievements
-        - End with a question or call-to-action
-        """
-        
-        human_prompt = f"""
-        Create an elevator pitch for someone seeking this role:
-        
-        Target Job: {job_title}
-        Target Company: {company}
-        Speaker: {user_name or "the job seeker"}
-        Tone: {tone}
+        system_prompt = _PITCH_SYSTEM_TMPL.substitute(tone=tone)
         
-        Job Requirements/Description:
-        {job_description[:800]}
-        
-        Structure:
-        1. Hook/Introduction (who you are)
-        2. What you do (current role/skills)
-        3. What you're looking for (target role)
-        4. Value proposition (what you bring)
-        5. Call-to-action (question/next step)
-        
-        Keep it conversational and natural.
-        """
+        human_prompt = _PITCH_USER_TMPL.substitute(
+            job_title=job_title,
+            company=company,
+            user_name=user_name or "the job seeker",
+            job_description=compress(job_description, 300)
+        )
         
         try:
-            response = self.llm([
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=human_prompt)
-            ])
-            
-            return {
-                'subject': f"Elevator Pitch - {job_title}",
-                'content': response.content.strip(),
-                'tips': [
-                    "Practice until it sounds natural",
-                    "Adjust based on your audience",
-                    "Have 30-second and 60-second versions",
-                    "End with a question to start conversation",
-                    "Be enthusiastic but not overwhelming"
-                ]
-            }
+            content = await self._complete("pitch", system_prompt, human_prompt)
+            return self._pitch_result(content, job_title)
             
         except Exception as e:
             return self._generate_fallback_pitch(job_title, company, user_name)
     
+    def _email_result(self, parsed: EmailOut, job_title: str, company: str) -> Dict[str, str]:
+        """Shape a parsed email into the message dict returned to callers"""
+        subject = parsed.subject.strip() or f"Application for {job_title} Position at {company}"
+        body = parsed.body.strip()
+        
+        return {
+            'subject': subject,
+            'content': body,
+            'tips': [
+                "Research the hiring manager's name if possible",
+                "Send during business hours (9 AM - 5 PM)",
+                "Follow up after 1-2 weeks if no response",
+                "Keep attachments under 5MB"
+            ]
+        }
+    
+    def _linkedin_result(self, parsed: LinkedInOut, job_title: str) -> Dict[str, str]:
+        """Shape a parsed LinkedIn message pair into the message dict returned to callers"""
+        connection_msg = parsed.connection_request.strip()
+        followup_msg = parsed.followup.strip()
+        
+        full_message = f"Connection Request:\n{connection_msg}\n\nFollow-up Message:\n{followup_msg}"
+        
+        return {
+            'subject': f"Connection Request - {job_title} Opportunity",
+            'content': full_message,
+            'tips': [
+                "Personalize with something from their profile",
+                "Connect on Tuesday-Thursday for best response rates",
+                "Don't pitch immediately after connecting",
+                "Engage with their posts before reaching out"
+            ]
+        }
+    
+    def _pitch_result(self, content: str, job_title: str) -> Dict[str, str]:
+        """Shape pitch text into the message dict returned to callers"""
+        return {
+            'subject': f"Elevator Pitch - {job_title}",
+            'content': content,
+            'tips': [
+                "Practice until it sounds natural",
+                "Adjust based on your audience",
+                "Have 30-second and 60-second versions",
+                "End with a question to start conversation",
+                "Be enthusiastic but not overwhelming"
+            ]
+        }
+    
     def _generate_fallback_email(self, job_title: str, company: str, user_name: str) -> Dict[str, str]:
         """Fallback email template if AI generation fails"""
         subject = f"Application for {job_title} Position"
@@ -0,0 +1,66 @@
+import io
+import json
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+_ENDPOINT = "/v1/chat/completions"
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def submit_batch(client, jobs: List[Dict[str, Any]]) -> str:
+    """Submit chat completion jobs to the OpenAI Batch API (50% cheaper, <=24h SLA).
+
+    Each job is a dict with a unique ``custom_id`` and the chat completion ``body``.
+    Returns the batch id.
+    """
+    lines = [
+        json.dumps({
+            "custom_id": job["custom_id"],
+            "method": "POST",
+            "url": _ENDPOINT,
+            "body": job["body"]
+        })
+        for job in jobs
+    ]
+    payload = io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+    input_file = client.files.create(file=("batch.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=_ENDPOINT,
+        completion_window="24h"
+    )
+    return batch.id
+
+
+def poll_batch(client, batch_id: str, interval: float = 30.0, timeout: Optional[float] = None):
+    """Block until the batch reaches a terminal status (or timeout) and return it"""
+    deadline = time.monotonic() + timeout if timeout else None
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in _TERMINAL_STATUSES:
+            return batch
+        if deadline and time.monotonic() >= deadline:
+            return batch
+        time.sleep(interval)
+
+
+def fetch_results(client, batch) -> Dict[str, Optional[str]]:
+    """Map each custom_id to its completion text (None for failed requests)"""
+    results: Dict[str, Optional[str]] = {}
+    if not getattr(batch, "output_file_id", None):
+        return results
+
+    content = client.files.content(batch.output_file_id).text
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id")
+        try:
+            body = record["response"]["body"]
+            results[custom_id] = body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            logging.error(f"Batch request {custom_id} failed: {record.get('error')}")
+            results[custom_id] = None
+    return results
@@ -1,21 +1,31 @@
 import os
-import openai
-from typing import Dict, Any
+import json
+import asyncio
+import hashlib
+import tempfile
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import logging
+from string import Template
+from services.llm_cache import llm_cache
+from services._async_loop import run_sync
+from services._openai_client import get_async_client, get_sync_client, on_client_loop, openai_retry
+from services.openai_batch import submit_batch, poll_batch, fetch_results
+from services.token_budget import CONTEXT_WINDOW, count_tokens, fit
+from services.latex_escape import LATEX_TRANS
 
-class OpenAILaTeXGenerator:
-    """Generate professional LaTeX resumes using OpenAI"""
-    
-    def __init__(self):
-        self.client = openai.OpenAI(
-            api_key=os.environ.get('OPENAI_API_KEY')
-        )
-    
-    def generate_resume_latex(self, resume_text: str, job_description: str = None) -> str:
-        """Generate complete LaTeX resume from text, optionally tailored to job"""
-        
-        # Strict template the model must follow
-        template_text = r"""\documentclass[10pt, letterpaper]{article}
+# Optional dependency: diskcache (local LRU of finished LaTeX documents)
+try:
+    import diskcache
+except Exception:  # pragma: no cover
+    diskcache = None
+
+_LATEX_CACHE_TTL = 7 * 86400
+
+# System prompts are module constants so every request sends a byte-identical
+# prefix, which lets OpenAI's automatic prompt caching reuse it across calls.
+
+# Strict template the model must follow
+_RESUME_TEMPLATE = r"""\documentclass[10pt, letterpaper]{article}
 
 % Packages:
 \usepackage[
@@ -100,7 +110,7 @@ class OpenAILaTeXGenerator:
 
 \end{document}"""
 
-        system_prompt = r"""You are an expert LaTeX resume writer.
+_RESUME_SYSTEM_PROMPT = r"""You are an expert LaTeX resume writer.
 
 Follow the EXACT LaTeX template skeleton provided below for every output. Recreate its structure, preamble, packages, environments, and sectioning. Then populate only with content derived from the original resume, tailored to the job description when provided.
 
@@ -112,55 +122,53 @@ Rules:
 - Keep formatting ATS-friendly and professional.
 
 TEMPLATE TO FOLLOW STRICTLY:
-""" + template_text + r"""
-"""
+""" + _RESUME_TEMPLATE + "\n"
 
-        if job_description:
-            user_prompt = (
-                "Please tailor the following original resume to the target job description and RETURN a full LaTeX document that strictly follows the template.\n\n"
-                "[ORIGINAL RESUME]\n" + resume_text + "\n\n"
-                "[TARGET JOB DESCRIPTION]\n" + job_description + "\n\n"
-                "Remember: Do not invent content. Omit sections not supported by the original resume."
-            )
-        else:
-            user_prompt = (
-                "Please convert the following original resume into a full LaTeX resume that strictly follows the template.\n\n"
-                "[ORIGINAL RESUME]\n" + resume_text + "\n\n"
-                "Remember: Do not invent content. Omit sections not supported by the original resume."
-            )
+_JOB_SYSTEM_PROMPT = r"""You are a document formatting expert. Your task is to convert a job description from plain text into a clean, professional, and readable LaTeX document.
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-            
-            latex_code = response.choices[0].message.content.strip()
-            
-            # Ensure it starts and ends properly
-            if not latex_code.lstrip().startswith('\\documentclass'):
-                # If model omitted docclass, prepend the template's docclass line
-                latex_code = '\\documentclass[10pt, letterpaper]{article}\n' + latex_code
-
-            if '\\end{document}' not in latex_code:
-                latex_code += '\n\\end{document}'
-                
-            return latex_code
-            
-        except Exception as e:
-            logging.error(f"OpenAI LaTeX generation failed: {e}")
-            # Fallback to basic template
-            return self._generate_fallback_latex(resume_text)
-    
-    def _generate_fallback_latex(self, resume_text: str) -> str:
-        """Fallback LaTeX template if OpenAI fails (uses the provided article template)."""
-        safe_text = (resume_text or "").replace("\\", "\\\\")
-        return r"""\documentclass[10pt, letterpaper]{article}
+**LaTeX Requirements:**
+- Use the `article` document class.
+- Use `titlesec` and `geometry` for good typography and layout.
+- Structure the document with a main title, author (company), and clear sections for different parts of the job description (e.g., Title, Company, Location, Description, Requirements).
+- Ensure the output is a complete, compilable LaTeX document.
+
+Your final output must be **only** the raw LaTeX code."""
+
+_RESUME_MAX_TOKENS = 2000
+# Tokens left for resume + job description after the system prompt, the
+# completion and ~200 tokens of user-prompt framing/message overhead
+_RESUME_INPUT_BUDGET = CONTEXT_WINDOW - count_tokens(_RESUME_SYSTEM_PROMPT) - _RESUME_MAX_TOKENS - 200
+
+# User prompt templates; per call only the $slots are substituted
+_TAILOR_USER_TMPL = Template("""Please tailor the following original resume to the target job description and RETURN a full LaTeX document that strictly follows the template.
+
+[ORIGINAL RESUME]
+$resume_text
+
+[TARGET JOB DESCRIPTION]
+$job_description
+
+Remember: Do not invent content. Omit sections not supported by the original resume.""")
+
+_CONVERT_USER_TMPL = Template("""Please convert the following original resume into a full LaTeX resume that strictly follows the template.
+
+[ORIGINAL RESUME]
+$resume_text
+
+Remember: Do not invent content. Omit sections not supported by the original resume.""")
+
+_JOB_USER_TMPL = Template("""Please convert the following job posting details into a complete LaTeX document based on my instructions.
+
+**Job Details:**
+- **Title:** $title
+- **Company:** $company
+- **Location:** $location
+- **Description:** $description_text
+- **Requirements:** $requirements
+""")
+
+# Fallback document wrapped around a snippet of the raw resume text
+_FALLBACK_HEAD = r"""\documentclass[10pt, letterpaper]{article}
 \usepackage[ignoreheadfoot,top=2 cm,bottom=2 cm,left=2 cm,right=2 cm,footskip=1.0 cm]{geometry}
 \usepackage{titlesec}
 \usepackage{tabularx}
@@ -210,49 +218,352 @@ TEMPLATE TO FOLLOW STRICTLY:
 \begin{onecolentry}
 Minimal fallback generated because AI failed. Below is extracted resume text snippet.\\\newline
 % Snippet from resume text:
-""" + safe_text[:600] + r"""
+"""
+
+_FALLBACK_TAIL = r"""
 \end{onecolentry}
 \end{document}"""
 
-    def generate_job_description_latex(self, job_data: Dict[str, Any]) -> str:
-        """Generate LaTeX document for job description"""
-        
-        system_prompt = r"""You are a document formatting expert. Your task is to convert a job description from plain text into a clean, professional, and readable LaTeX document.
+def _open_latex_cache():
+    """Open the on-disk LaTeX LRU cache, or None if diskcache is unavailable"""
+    if diskcache is None:
+        return None
+    try:
+        return diskcache.Cache(
+            os.environ.get('LATEX_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ai_resume_latex')),
+            size_limit=2 * 1024 ** 3,
+            eviction_policy='least-recently-used'
+        )
+    except Exception as e:
+        logging.warning(f"LaTeX cache disabled: {e}")
+        return None
 
-**LaTeX Requirements:**
-- Use the `article` document class.
-- Use `titlesec` and `geometry` for good typography and layout.
-- Structure the document with a main title, author (company), and clear sections for different parts of the job description (e.g., Title, Company, Location, Description, Requirements).
-- Ensure the output is a complete, compilable LaTeX document.
 
-Your final output must be **only** the raw LaTeX code."""
-        
-        user_prompt = f"""Please convert the following job posting details into a complete LaTeX document based on my instructions.
+def _latex_key(kind: str, *parts: str) -> str:
+    """Hash the generation inputs into a compact cache key"""
+    payload = "\x00".join((kind,) + parts)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
 
-**Job Details:**
-- **Title:** {job_data.get('title', 'N/A')}
-- **Company:** {job_data.get('company', 'N/A')}
-- **Location:** {job_data.get('location', 'N/A')}
-- **Description:** {job_data.get('description_text', 'N/A')}
-- **Requirements:** {job_data.get('requirements', 'N/A')}
-"""
 
+class OpenAILaTeXGenerator:
+    """Generate professional LaTeX resumes using OpenAI"""
+    
+    def __init__(self):
+        self.client = get_sync_client()
+        self.aclient = get_async_client()
+        self.cache = llm_cache
+        # Finished documents keyed by their inputs, so regenerating the same
+        # resume/job pair skips the API call (and prompt building) entirely
+        self.latex_cache = _open_latex_cache()
+    
+    @openai_retry
+    def _call_openai(self, **kwargs):
+        """Chat completion with retry on transient errors"""
+        return self.client.chat.completions.create(**kwargs)
+    
+    def _chat(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+              model: str = "gpt-3.5-turbo") -> str:
+        """Run a chat completion, serving repeated and concurrent identical prompts from one call"""
+        def call():
+            response = self._call_openai(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            ).model_dump()
+            details = (response.get('usage') or {}).get('prompt_tokens_details') or {}
+            logging.debug(f"OpenAI prompt cache: {details.get('cached_tokens', 0)} cached prompt tokens")
+            return response
+        
+        result = self.cache.get_or_call(call, model, messages, temperature)
+        return (result['choices'][0]['message']['content'] or '').strip()
+    
+    @openai_retry
+    async def _acall_openai(self, **kwargs):
+        """Async chat completion with retry; runs on the concurrency-limited client loop"""
+        return await on_client_loop(self.aclient.chat.completions.create(**kwargs))
+    
+    async def _achat(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                     model: str = "gpt-3.5-turbo") -> str:
+        """Async _chat"""
+        async def call():
+            response = await self._acall_openai(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            return response.model_dump()
+        
+        result = await self.cache.aget_or_call(call, model, messages, temperature)
+        return (result['choices'][0]['message']['content'] or '').strip()
+    
+    def generate_resume_latex(self, resume_text: str, job_description: str = None) -> str:
+        """Generate complete LaTeX resume from text, optionally tailored to job"""
+        key = _latex_key("resume", resume_text or "", job_description or "")
+        cached = self._latex_cache_get(key)
+        if cached:
+            return cached
+        
+        try:
+            latex_code = self._chat(
+                messages=self._resume_messages(resume_text, job_description),
+                temperature=0.3,
+                max_tokens=_RESUME_MAX_TOKENS
+            )
+            latex_code = self._finalize_latex(latex_code)
+            
+        except Exception as e:
+            logging.error(f"OpenAI LaTeX generation failed: {e}")
+            # Fallback to basic template
+            return self._generate_fallback_latex(resume_text)
+        
+        self._latex_cache_set(key, latex_code)
+        return latex_code
+    
+    async def agenerate_resume_latex(self, resume_text: str, job_description: str = None) -> str:
+        """Async generate_resume_latex"""
+        key = _latex_key("resume", resume_text or "", job_description or "")
+        cached = self._latex_cache_get(key)
+        if cached:
+            return cached
+        
         try:
-            response = self.client.chat.completions.create(
+            latex_code = await self._achat(
+                messages=self._resume_messages(resume_text, job_description),
+                temperature=0.3,
+                max_tokens=_RESUME_MAX_TOKENS
+            )
+            latex_code = self._finalize_latex(latex_code)
+            
+        except Exception as e:
+            logging.error(f"OpenAI LaTeX generation failed: {e}")
+            return self._generate_fallback_latex(resume_text)
+        
+        self._latex_cache_set(key, latex_code)
+        return latex_code
+    
+    async def arender_pair(self, resume_text: str, job_description: str,
+                           job_data: Dict[str, Any]) -> Tuple[str, str]:
+        """Generate the tailored resume and job description LaTeX concurrently"""
+        return tuple(await asyncio.gather(
+            self.agenerate_resume_latex(resume_text, job_description),
+            self.agenerate_job_description_latex(job_data)
+        ))
+    
+    def render_pair(self, resume_text: str, job_description: str,
+                    job_data: Dict[str, Any]) -> Tuple[str, str]:
+        """Blocking arender_pair: one round of latency instead of two back-to-back calls"""
+        return run_sync(self.arender_pair(resume_text, job_description, job_data))
+    
+    def generate_resume_latex_stream(self, resume_text: str, job_description: str = None) -> Iterator[str]:
+        """Yield LaTeX tokens as they arrive instead of waiting for the full completion.
+        
+        The joined chunks are the finished document: the preamble line is sent first
+        and the closing line last when the model omits them, and the result is stored
+        under the same key as generate_resume_latex.
+        """
+        key = _latex_key("resume", resume_text or "", job_description or "")
+        cached = self._latex_cache_get(key)
+        if cached:
+            yield cached
+            return
+        
+        messages = self._resume_messages(resume_text, job_description)
+        if self.cache.known("gpt-3.5-turbo", messages, 0.3):
+            # Cached or already being generated: share that response instead of a second call
+            yield self.generate_resume_latex(resume_text, job_description)
+            return
+        
+        parts = []
+        head = ''
+        try:
+            stream = self._call_openai(
                 model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=messages,
+                temperature=0.3,
+                max_tokens=_RESUME_MAX_TOKENS,
+                stream=True
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content or ""
+                if not token:
+                    continue
+                if head is not None:
+                    # Hold tokens back until we know whether the preamble line is there
+                    head += token
+                    if len(head.lstrip()) < len('\\documentclass'):
+                        continue
+                    token, head = head, None
+                    if not token.lstrip().startswith('\\documentclass'):
+                        token = '\\documentclass[10pt, letterpaper]{article}\n' + token
+                parts.append(token)
+                yield token
+        except Exception as e:
+            logging.error(f"OpenAI LaTeX streaming failed: {e}")
+            sent = ''.join(parts)
+            if not sent:
+                yield self._generate_fallback_latex(resume_text)
+            elif '\\end{document}' not in sent:
+                # Close what was already sent so it still compiles; the comment tells the
+                # client it is incomplete, and nothing is cached
+                yield ('\n% Generation interrupted: the document above is incomplete\n'
+                       + ('' if '\\begin{document}' in sent else '\\begin{document}\n')
+                       + '\\end{document}')
+            return
+        
+        if head:
+            # Completion shorter than the preamble line
+            parts.append(self._finalize_latex(head))
+            yield parts[-1]
+        elif not parts:
+            yield self._generate_fallback_latex(resume_text)
+            return
+        elif '\\end{document}' not in ''.join(parts):
+            parts.append('\n\\end{document}')
+            yield parts[-1]
+        
+        self._latex_cache_set(key, ''.join(parts))
+    
+    def generate_resume_latex_batch(self, items: List[Dict[str, Any]]) -> str:
+        """Queue non-interactive resume generations on the OpenAI Batch API.
+        
+        Each item needs an ``id``, ``resume_text`` and optional ``job_description``.
+        Interactive requests should keep using generate_resume_latex. Returns the batch id.
+        """
+        jobs = [
+            {
+                "custom_id": str(item['id']),
+                "body": {
+                    "model": "gpt-3.5-turbo",
+                    "messages": self._resume_messages(item['resume_text'], item.get('job_description')),
+                    "temperature": 0.3,
+                    "max_tokens": _RESUME_MAX_TOKENS
+                }
+            }
+            for item in items
+        ]
+        return submit_batch(self.client, jobs)
+    
+    def collect_resume_latex_batch(self, batch_id: str, items: List[Dict[str, Any]],
+                                   interval: float = 30.0, timeout: float = None) -> Dict[str, str]:
+        """Wait for a batch from generate_resume_latex_batch and return LaTeX per item id"""
+        batch = poll_batch(self.client, batch_id, interval=interval, timeout=timeout)
+        outputs = fetch_results(self.client, batch)
+        results = {}
+        for item in items:
+            latex_code = outputs.get(str(item['id']))
+            if latex_code:
+                results[str(item['id'])] = self._finalize_latex(latex_code.strip())
+            else:
+                results[str(item['id'])] = self._generate_fallback_latex(item['resume_text'])
+        return results
+    
+    def _resume_messages(self, resume_text: str, job_description: str = None) -> List[Dict[str, str]]:
+        """Build the chat messages for resume generation, budgeted to fit the context window"""
+        if job_description:
+            user_prompt = _TAILOR_USER_TMPL.substitute(
+                resume_text=fit(resume_text, _RESUME_INPUT_BUDGET // 2),
+                job_description=fit(job_description, _RESUME_INPUT_BUDGET // 2)
+            )
+        else:
+            user_prompt = _CONVERT_USER_TMPL.substitute(resume_text=fit(resume_text, _RESUME_INPUT_BUDGET))
+        return [
+            {"role": "system", "content": _RESUME_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+    
+    def _latex_cache_get(self, key: str) -> Optional[str]:
+        if self.latex_cache is None:
+            return None
+        try:
+            return self.latex_cache.get(key)
+        except Exception:
+            return None
+    
+    def _latex_cache_set(self, key: str, latex_code: str) -> None:
+        # Fallback documents are never stored, so a later call can still reach the API
+        if self.latex_cache is None:
+            return
+        try:
+            self.latex_cache.set(key, latex_code, expire=_LATEX_CACHE_TTL)
+        except Exception:
+            pass  # Caching is best effort
+    
+    def _finalize_latex(self, latex_code: str) -> str:
+        """Ensure generated LaTeX starts and ends properly"""
+        if not latex_code.lstrip().startswith('\\documentclass'):
+            # If model omitted docclass, prepend the template's docclass line
+            latex_code = '\\documentclass[10pt, letterpaper]{article}\n' + latex_code
+
+        if '\\end{document}' not in latex_code:
+            latex_code += '\n\\end{document}'
+            
+        return latex_code
+    
+    def _generate_fallback_latex(self, resume_text: str) -> str:
+        """Fallback LaTeX template if OpenAI fails (uses the provided article template)."""
+        # Truncate before escaping so an escape sequence is never cut in half
+        safe_text = (resume_text or "")[:600].translate(LATEX_TRANS)
+        return _FALLBACK_HEAD + safe_text + _FALLBACK_TAIL
+
+    def generate_job_description_latex(self, job_data: Dict[str, Any]) -> str:
+        """Generate LaTeX document for job description"""
+        key = _latex_key("job", json.dumps(sorted(job_data.items()), default=str))
+        cached = self._latex_cache_get(key)
+        if cached:
+            return cached
+        
+        try:
+            latex_code = self._chat(
+                messages=self._job_messages(job_data),
                 temperature=0.3,
                 max_tokens=1500
             )
             
-            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logging.error(f"OpenAI job LaTeX generation failed: {e}")
+            return self._generate_fallback_job_latex(job_data)
+        
+        self._latex_cache_set(key, latex_code)
+        return latex_code
+    
+    async def agenerate_job_description_latex(self, job_data: Dict[str, Any]) -> str:
+        """Async generate_job_description_latex"""
+        key = _latex_key("job", json.dumps(sorted(job_data.items()), default=str))
+        cached = self._latex_cache_get(key)
+        if cached:
+            return cached
+        
+        try:
+            latex_code = await self._achat(
+                messages=self._job_messages(job_data),
+                temperature=0.3,
+                max_tokens=1500
+            )
             
         except Exception as e:
             logging.error(f"OpenAI job LaTeX generation failed: {e}")
             return self._generate_fallback_job_latex(job_data)
+        
+        self._latex_cache_set(key, latex_code)
+        return latex_code
+    
+    def _job_messages(self, job_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Build the chat messages for job description LaTeX"""
+        user_prompt = _JOB_USER_TMPL.substitute(
+            title=job_data.get('title', 'N/A'),
+            company=job_data.get('company', 'N/A'),
+            location=job_data.get('location', 'N/A'),
+            description_text=job_data.get('description_text', 'N/A'),
+            requirements=job_data.get('requirements', 'N/A')
+        )
+        return [
+            {"role": "system", "content": _JOB_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
     
     def _generate_fallback_job_latex(self, job_data: Dict[str, Any]) -> str:
         """Fallback job description LaTeX"""
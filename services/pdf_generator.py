@@ -1,54 +1,370 @@
+import io
 import os
+import re
+import shutil
+import hashlib
+import time
 import tempfile
+import threading
 import subprocess
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
+from flask import current_app, has_app_context
 
-# Optional dependency: xhtml2pdf (pure pip install)
-try:
-    from xhtml2pdf import pisa
-except Exception:  # pragma: no cover
-    pisa = None
+# Optional dependencies are heavy to import, so they are loaded on first use
 
-# Optional dependency: plasTeX for LaTeX -> HTML preview
-try:
-    from plasTeX import TeX as _PlasTeXTeX
-    from plasTeX.Renderers import HTML5 as _PlasTeXHTML5
-except Exception:  # pragma: no cover
-    _PlasTeXTeX = None
-    _PlasTeXHTML5 = None
+
+@lru_cache(maxsize=1)
+def _pisa():
+    """Optional dependency: xhtml2pdf (pure pip install)"""
+    try:
+        from xhtml2pdf import pisa
+    except Exception:  # pragma: no cover
+        pisa = None
+    return pisa
+
+
+@lru_cache(maxsize=1)
+def _plastex():
+    """Optional dependency: plasTeX for LaTeX -> HTML preview; returns (TeX, HTML5) or (None, None)"""
+    try:
+        from plasTeX import TeX
+        from plasTeX.Renderers import HTML5
+    except Exception:  # pragma: no cover
+        return None, None
+    return TeX, HTML5
+
+
+# Constructs whose output depends on the .aux file from a previous run
+_XREF_RE = re.compile(r'\\(?:ref|pageref|eqref|autoref|cite|label|tableofcontents|listoffigures|listoftables)\b')
+
+# Flag that makes each engine resolve references without producing a PDF
+_DRAFT_FLAGS = {
+    'xelatex': '-no-pdf',
+    'lualatex': '-draftmode',
+    'pdflatex': '-draftmode'
+}
+
+# latexmk flag selecting each engine's PDF route
+_LATEXMK_FLAGS = {
+    'xelatex': '-pdfxe',
+    'lualatex': '-pdflua',
+    'pdflatex': '-pdf'
+}
+
+_BEGIN_DOCUMENT = '\\begin{document}'
+
+# Document head and stylesheet for the simple LaTeX -> HTML converter
+_HTML_HEAD = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body { 
+                    font-family: 'Times New Roman', serif; 
+                    font-size: 11pt; 
+                    line-height: 1.4; 
+                    margin: 0; 
+                    padding: 20px;
+                }
+                .header { 
+                    text-align: center; 
+                    margin-bottom: 20px; 
+                    border-bottom: 2px solid #333;
+                    padding-bottom: 10px;
+                }
+                .name { 
+                    font-size: 18pt; 
+                    font-weight: bold; 
+                    margin-bottom: 5px; 
+                }
+                .contact { 
+                    font-size: 10pt; 
+                    color: #666; 
+                }
+                .section { 
+                    margin: 15px 0; 
+                }
+                .section-title { 
+                    font-size: 12pt; 
+                    font-weight: bold; 
+                    text-transform: uppercase; 
+                    border-bottom: 1px solid #333; 
+                    margin-bottom: 8px; 
+                    padding-bottom: 2px;
+                }
+                .item { 
+                    margin: 8px 0; 
+                }
+                .item-title { 
+                    font-weight: bold; 
+                    margin-bottom: 3px; 
+                }
+                .item-details { 
+                    margin-left: 15px; 
+                }
+                ul { 
+                    margin: 5px 0; 
+                    padding-left: 20px; 
+                }
+                li { 
+                    margin: 2px 0; 
+                }
+            </style>
+        </head>
+        <body>
+        """
+
+# TeX is single-threaded and CPU-heavy: cap concurrent engine processes at the
+# core count (across request threads and the async pool) to avoid oversubscription
+_TEX_WORKERS = os.cpu_count() or 2
+_TEX_SLOTS = threading.BoundedSemaphore(_TEX_WORKERS)
+# Threads suffice for fan-out since the heavy lifting happens in TeX subprocesses
+_PDF_POOL = ThreadPoolExecutor(max_workers=_TEX_WORKERS, thread_name_prefix='pdf')
+
+# Keep a warm standby engine per format (set LATEX_DAEMON=0 to always cold-start)
+_USE_LATEX_DAEMON = os.environ.get('LATEX_DAEMON', '1') != '0'
+
+_BRACE_RE = re.compile(r'[{}]')
+_STRIP_BRACES = str.maketrans('', '', '{}')
+
+# Compiled PDFs/HTML previews are reused for identical sources for this long
+_RESULT_CACHE_TTL = 7 * 86400
+
+# A preamble whose format failed to build or load is retried after this long
+_FORMAT_RETRY_AFTER = 86400
+
+class LatexFormatError(Exception):
+    """TeX stopped before reading the document, so the format (not the source) is at fault"""
+
+
+class LatexDaemonError(LatexFormatError):
+    """The standby engine died before it read the document (format or driver problem)"""
+
+
+def _read_input(tex_file: str, transcript: str) -> bool:
+    """Whether TeX got as far as opening tex_file; it wraps output at 79 columns, so rejoin lines"""
+    return os.path.basename(tex_file) in transcript.replace('\n', '')
+
+
+class LatexDaemon:
+    """Warm standby TeX engine for one (compiler, format) pair.
+    
+    TeX typesets a single document per run, so a process can't be reused; instead
+    the next engine is spawned ahead of time. It loads its format and then blocks
+    on a terminal \\read for the path of the file to typeset, so a request only
+    pays for typesetting the body. Every engine, standby or busy, holds one of the
+    _TEX_SLOTS; a standby is only pre-spawned when a slot is free.
+    """
+    
+    # Runs once the format is loaded: read the path from stdin, then input it
+    _DRIVER = r'\endlinechar=-1 \read16 to\resumefile \endlinechar=13 \expandafter\input\expandafter{\resumefile}'
+    
+    def __init__(self, compiler: str, scratch_dir: str, fmt_name: Optional[str] = None, env=None):
+        self.compiler = compiler
+        self.scratch_dir = scratch_dir
+        self.fmt_name = fmt_name
+        self.env = env
+        self.broken = False
+        self._lock = threading.Lock()
+        self._standby = None  # (Popen, work_dir), holding a _TEX_SLOTS slot
+    
+    def _spawn(self):
+        """Start an engine; the caller must already hold a _TEX_SLOTS slot for it"""
+        work_dir = tempfile.mkdtemp(prefix='latexd_', dir=self.scratch_dir)
+        args = [self.compiler]
+        if self.fmt_name:
+            args.append(f'-fmt={self.fmt_name}')
+        # scrollmode: nonstop/batch modes refuse to \read from the terminal
+        args += ['-interaction=scrollmode', '-halt-on-error', '-jobname=resume',
+                 '-output-directory', work_dir, self._DRIVER]
+        try:
+            proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True, cwd=work_dir, env=self.env)
+        except Exception:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        return proc, work_dir
+    
+    @staticmethod
+    def _discard(standby) -> None:
+        """Kill an engine, remove its directory and give back its slot"""
+        proc, work_dir = standby
+        try:
+            if proc.poll() is None:
+                proc.kill()
+            proc.communicate()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            _TEX_SLOTS.release()
+    
+    def compile(self, source: str, pdf_path: str, timeout: int = 60) -> None:
+        """Typeset source with the standby engine and move the PDF to pdf_path.
+        
+        Raises LatexDaemonError if the engine died before reading the document,
+        and a plain Exception if the document itself failed to compile.
+        """
+        with self._lock:
+            standby, self._standby = self._standby, None
+        if standby is not None and standby[0].poll() is not None:
+            # Exited while waiting for input: the format/driver doesn't work
+            self._discard(standby)
+            raise LatexDaemonError(f"{self.compiler} standby engine exited before reading input")
+        if standby is None:
+            _TEX_SLOTS.acquire()
+            try:
+                standby = self._spawn()
+            except Exception:
+                _TEX_SLOTS.release()
+                raise
+        self._prespawn()
+        
+        proc, work_dir = standby
+        try:
+            tex_file = os.path.join(work_dir, 'input.tex')
+            with open(tex_file, 'w', encoding='utf-8') as f:
+                f.write(source)
+            try:
+                output, _ = proc.communicate(tex_file + '\n', timeout=timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
+            except (BrokenPipeError, OSError) as e:
+                raise LatexDaemonError(f"{self.compiler} standby engine exited before reading input: {e}")
+            built_pdf = os.path.join(work_dir, 'resume.pdf')
+            if proc.returncode != 0 or not os.path.exists(built_pdf):
+                if not _read_input(tex_file, output):
+                    raise LatexDaemonError(f"{self.compiler} standby engine failed before reading input:\n{output}")
+                raise Exception(f"LaTeX compilation error (using {self.compiler} daemon):\n{output}")
+            os.replace(built_pdf, pdf_path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            _TEX_SLOTS.release()
+    
+    def _prespawn(self) -> None:
+        """Warm the next engine if a slot is free; otherwise the next compile spawns its own"""
+        if self.broken or not _TEX_SLOTS.acquire(blocking=False):
+            return
+        try:
+            standby = self._spawn()
+        except Exception:
+            _TEX_SLOTS.release()
+            return
+        with self._lock:
+            previous, self._standby = self._standby, standby
+        if previous is not None:
+            self._discard(previous)
+    
+    def close(self) -> None:
+        """Stop the standby engine"""
+        with self._lock:
+            standby, self._standby = self._standby, None
+        if standby is not None:
+            self._discard(standby)
+
+
+# Daemons by (compiler, format), least recently used first. Each can hold a slot for
+# its standby, so keep them well below _TEX_WORKERS to leave room for cold compiles.
+_MAX_DAEMONS = max(1, _TEX_WORKERS // 2)
+_DAEMONS = OrderedDict()
+_DAEMONS_LOCK = threading.Lock()
+
+
+def _get_daemon(compiler: str, scratch_dir: str, fmt_name: Optional[str], env) -> LatexDaemon:
+    evicted = []
+    with _DAEMONS_LOCK:
+        key = (compiler, fmt_name)
+        daemon = _DAEMONS.get(key)
+        if daemon is None:
+            daemon = _DAEMONS[key] = LatexDaemon(compiler, scratch_dir, fmt_name, env)
+            while len(_DAEMONS) > _MAX_DAEMONS:
+                evicted.append(_DAEMONS.popitem(last=False)[1])
+        else:
+            _DAEMONS.move_to_end(key)
+    for old in evicted:
+        old.close()
+    return daemon
+
+
+def _scratch_dir() -> str:
+    """Prefer memory-backed /dev/shm for TeX's many small aux/log/font-cache writes"""
+    shm = '/dev/shm'
+    if os.path.isdir(shm) and os.access(shm, os.W_OK | os.X_OK):
+        return shm
+    return tempfile.gettempdir()
+
+
+@lru_cache(maxsize=1)
+def _find_latex_compiler() -> Optional[str]:
+    """Find available LaTeX compiler (prefer XeLaTeX/LuaLaTeX for font support), once per process"""
+    compilers = ['xelatex', 'lualatex', 'pdflatex']
+    for compiler in compilers:
+        # PATH lookup is a few stat() calls; only probe binaries that actually exist
+        if shutil.which(compiler) is None:
+            continue
+        try:
+            result = subprocess.run([compiler, '--version'], 
+                                  capture_output=True, text=True, timeout=5)
+            if result.returncode == 0:
+                return compiler
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            continue
+    return None
+
+@lru_cache(maxsize=1)
+def _cache_dir() -> Optional[str]:
+    """First writable cache directory (PDF_CACHE_DIR, ~/.cache, then the temp dir), or None"""
+    candidates = [
+        os.environ.get('PDF_CACHE_DIR'),
+        os.path.join(os.path.expanduser('~'), '.cache', 'resume_taylor', 'latex_cache'),
+        os.path.join(tempfile.gettempdir(), 'resume_taylor_latex_cache')
+    ]
+    for path in filter(None, candidates):
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError:
+            continue
+        if os.access(path, os.W_OK | os.X_OK):
+            return path
+    print("No writable PDF cache directory; format and result caching disabled")
+    return None
+
+@lru_cache(maxsize=1)
+def _latexmk_available() -> bool:
+    return shutil.which('latexmk') is not None
 
 class PDFGenerator:
     """Service for generating PDF files from LaTeX source"""
     
     def __init__(self):
-        self.temp_dir = tempfile.gettempdir()
-        self.latex_compiler = self._find_latex_compiler()
+        self.temp_dir = _scratch_dir()
+        # Persistent across processes: precompiled preamble formats and results live here.
+        # None (nothing writable) turns both caches off rather than failing the request.
+        self.cache_dir = _cache_dir()
+        self.latex_compiler = _find_latex_compiler()
         self.last_method: Optional[str] = None  # 'latex' or 'html_fallback'
     
-    def _find_latex_compiler(self) -> Optional[str]:
-        """Find available LaTeX compiler (prefer XeLaTeX/LuaLaTeX for font support)"""
-        compilers = ['xelatex', 'lualatex', 'pdflatex']
-        for compiler in compilers:
-            try:
-                result = subprocess.run([compiler, '--version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    return compiler
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                continue
-        return None
-    
     def generate_pdf(self, latex_source: str, output_name: str = None) -> str:
         """Generate PDF from LaTeX source"""
         if not output_name:
-            output_name = f"resume_{os.getpid()}"
+            output_name = f"resume_{os.getpid()}_{threading.get_ident()}"
+        
+        # Identical sources (e.g. preview refreshes) reuse the compiled PDF
+        cached_pdf = self._result_cache_path(latex_source, '.pdf')
+        if cached_pdf and self._is_fresh(cached_pdf):
+            self.last_method = 'latex'
+            return cached_pdf
         
         # Try LaTeX compilation first
         if self.latex_compiler:
             try:
                 pdf = self._compile_latex_to_pdf(latex_source, output_name)
                 self.last_method = 'latex'
-                return pdf
+                return self._store_result(pdf, cached_pdf) if cached_pdf else pdf
             except Exception as e:
                 print(f"LaTeX compilation failed: {e}")
         
@@ -57,17 +373,44 @@ class PDFGenerator:
         self.last_method = 'html_fallback'
         return pdf
 
+    def generate_pdf_async(self, latex_source: str, output_name: str = None) -> Future:
+        """Queue generate_pdf on the shared PDF worker pool and return its Future"""
+        return _PDF_POOL.submit(self.generate_pdf, latex_source, output_name)
+
     def generate_html(self, latex_source: str) -> str:
         """Generate HTML preview from LaTeX source.
         Tries plasTeX if available; falls back to simple converter otherwise.
         """
+        cached_html = self._result_cache_path(latex_source, '.html')
+        if cached_html and self._is_fresh(cached_html):
+            try:
+                with open(cached_html, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except Exception:
+                pass
+        
+        html = self._render_html(latex_source)
+        if not cached_html:
+            return html
+        try:
+            tmp_path = f"{cached_html}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_path, cached_html)
+        except Exception:
+            pass  # Caching is best effort
+        return html
+    
+    def _render_html(self, latex_source: str) -> str:
+        """Render HTML with plasTeX, or the simple converter if that is unavailable/fails"""
         # Try plasTeX first
-        if _PlasTeXTeX and _PlasTeXHTML5:
+        plastex_tex, plastex_html5 = _plastex()
+        if plastex_tex and plastex_html5:
             try:
-                tex = _PlasTeXTeX()
+                tex = plastex_tex()
                 tex.input(latex_source)
                 doc = tex.parse()
-                renderer = _PlasTeXHTML5.Renderer() if hasattr(_PlasTeXHTML5, 'Renderer') else _PlasTeXHTML5()
+                renderer = plastex_html5.Renderer() if hasattr(plastex_html5, 'Renderer') else plastex_html5()
                 result = renderer.render(doc)
 
                 # plasTeX may return dict of files -> content
@@ -92,66 +435,234 @@ class PDFGenerator:
         # Fallback simple converter
         return self._latex_to_html(latex_source)
     
+    def _result_cache_path(self, latex_source: str, ext: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        key = hashlib.blake2b(latex_source.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{key}{ext}")
+    
+    def _store_result(self, path: str, cached_path: str) -> str:
+        """Move a compiled file into the result cache and return where it ended up"""
+        try:
+            # temp_dir and cache_dir may be on different filesystems; stage a copy
+            # next to the target so the final rename is atomic for concurrent readers
+            tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, cached_path)
+            os.remove(path)
+            return cached_path
+        except Exception:
+            return path  # Caching is best effort
+    
+    def _is_fresh(self, path: str) -> bool:
+        try:
+            return time.time() - os.path.getmtime(path) < _RESULT_CACHE_TTL
+        except OSError:
+            return False
+    
     def _compile_latex_to_pdf(self, latex_source: str, output_name: str) -> str:
-        """Compile LaTeX to PDF using pdflatex"""
-        # Create temporary files
-        tex_file = os.path.join(self.temp_dir, f"{output_name}.tex")
+        """Compile LaTeX to PDF with the detected engine"""
+        # Each job builds in its own directory so concurrent .aux/.log files never collide
+        job_dir = tempfile.mkdtemp(prefix='latex_', dir=self.temp_dir)
+        tex_file = os.path.join(job_dir, f"{output_name}.tex")
         pdf_file = os.path.join(self.temp_dir, f"{output_name}.pdf")
         
-        # Write LaTeX source to file
-        with open(tex_file, 'w', encoding='utf-8') as f:
-            f.write(latex_source)
-        
         # Compile LaTeX
         try:
-            # Run pdflatex twice for proper cross-references
-            for _ in range(2):
-                result = subprocess.run([
-                    self.latex_compiler,
-                    '-interaction=nonstopmode',
-                    '-halt-on-error',
-                    '-output-directory', self.temp_dir,
-                    tex_file
-                ], capture_output=True, text=True, timeout=60)
-                
-                if result.returncode != 0:
-                    raise Exception(f"LaTeX compilation error (using {self.latex_compiler}):\nSTDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}")
+            fmt_name = self._preamble_format(latex_source)
+            if fmt_name:
+                # The preamble is already loaded in the format; compile only the body
+                body = latex_source[latex_source.find(_BEGIN_DOCUMENT):]
+                try:
+                    self._run_latex(tex_file, body, job_dir, fmt_name)
+                except LatexFormatError as e:
+                    # Only a format that fails to load is dropped; errors in the document
+                    # body propagate as-is instead of compiling the bad source twice
+                    print(f"Precompiled preamble failed to load, using full source: {e}")
+                    self._discard_format(fmt_name)
+                    fmt_name = None
+            if not fmt_name:
+                self._run_latex(tex_file, latex_source, job_dir)
             
-            if not os.path.exists(pdf_file):
+            built_pdf = os.path.join(job_dir, f"{output_name}.pdf")
+            if not os.path.exists(built_pdf):
                 raise Exception("PDF file was not generated")
             
+            os.replace(built_pdf, pdf_file)
             return pdf_file
             
         except subprocess.TimeoutExpired:
             raise Exception("LaTeX compilation timed out")
-        except Exception as e:
+        finally:
             # Clean up temporary files
-            for ext in ['.tex', '.aux', '.log', '.out']:
-                temp_file = os.path.join(self.temp_dir, f"{output_name}{ext}")
+            shutil.rmtree(job_dir, ignore_errors=True)
+    
+    def _run_latex(self, tex_file: str, source: str, output_dir: str, fmt_name: Optional[str] = None) -> None:
+        """Write source to tex_file and run the engine over it"""
+        with open(tex_file, 'w', encoding='utf-8') as f:
+            f.write(source)
+        
+        fmt_args, env = [], None
+        if fmt_name:
+            fmt_args = [f'-fmt={fmt_name}']
+            # Trailing separator keeps the default format search path after ours
+            env = {**os.environ, 'TEXFORMATS': self.cache_dir + os.pathsep}
+        
+        # Cross-references need a draft pass to write the .aux file first;
+        # documents without any (the usual resume) compile in a single pass
+        passes = [[]]
+        if _XREF_RE.search(source):
+            if _latexmk_available():
+                # latexmk reruns until references converge, however many passes that takes
+                self._run_latexmk(tex_file, output_dir, fmt_args, env)
+                return
+            passes.insert(0, [_DRAFT_FLAGS[self.latex_compiler]])
+        elif _USE_LATEX_DAEMON:
+            # Single pass: hand it to a warm engine that already has the format loaded
+            daemon = _get_daemon(self.latex_compiler, self.temp_dir, fmt_name, env)
+            if not daemon.broken:
+                try:
+                    daemon.compile(source, os.path.splitext(tex_file)[0] + '.pdf')
+                    return
+                except LatexDaemonError as e:
+                    # Don't keep paying for a daemon that can't build this format;
+                    # document errors propagate instead and leave the daemon alone
+                    print(f"LaTeX daemon failed, using cold compiles: {e}")
+                    daemon.broken = True
+                    daemon.close()
+        for extra_args in passes:
+            with _TEX_SLOTS:
+                result = subprocess.run([
+                    self.latex_compiler,
+                    *fmt_args,
+                    '-interaction=nonstopmode',
+                    '-halt-on-error',
+                    *extra_args,
+                    '-output-directory', output_dir,
+                    tex_file
+                ], capture_output=True, text=True, timeout=60, env=env)
+            
+            if result.returncode != 0:
+                if fmt_args and not _read_input(tex_file, result.stdout):
+                    raise LatexFormatError(f"{self.latex_compiler} could not load format {fmt_name}:\n{result.stdout}")
+                raise Exception(f"LaTeX compilation error (using {self.latex_compiler}):\nSTDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}")
+    
+    def _run_latexmk(self, tex_file: str, output_dir: str, fmt_args: list, env) -> None:
+        """Build tex_file with latexmk, which picks the number of passes from the .aux/.fls files"""
+        with _TEX_SLOTS:
+            result = subprocess.run([
+                'latexmk',
+                _LATEXMK_FLAGS[self.latex_compiler],
+                '-recorder',
+                '-interaction=nonstopmode',
+                '-halt-on-error',
+                *(f'-latexoption={arg}' for arg in fmt_args),
+                f'-output-directory={output_dir}',
+                tex_file
+            ], capture_output=True, text=True, timeout=120, env=env)
+        
+        if result.returncode != 0:
+            if fmt_args:
+                log_file = os.path.join(output_dir, os.path.splitext(os.path.basename(tex_file))[0] + '.log')
+                try:
+                    with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+                        log = f.read()
+                except OSError:
+                    log = ''
+                if not _read_input(tex_file, log):
+                    raise LatexFormatError(f"latexmk/{self.latex_compiler} could not load {fmt_args[0]}:\n{result.stdout}")
+            raise Exception(f"LaTeX compilation error (using latexmk/{self.latex_compiler}):\nSTDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}")
+    
+    def _preamble_format(self, latex_source: str) -> Optional[str]:
+        """Return the name of a precompiled format for this document's preamble.
+        
+        Loading the document class and packages dominates compile time for short
+        documents, so each distinct preamble is dumped to a .fmt file once and
+        reused. Returns None when the preamble can't be dumped (e.g. fontspec fonts).
+        """
+        if not self.cache_dir:
+            return None
+        split = latex_source.find(_BEGIN_DOCUMENT)
+        if split == -1:
+            return None
+        preamble = latex_source[:split]
+        if '\\documentclass' not in preamble:
+            return None
+        
+        digest = hashlib.blake2b(f"{self.latex_compiler}\x00{preamble}".encode('utf-8'), digest_size=8).hexdigest()
+        fmt_name = f"preamble_{digest}"
+        if os.path.exists(os.path.join(self.cache_dir, f"{fmt_name}.fmt")):
+            return fmt_name
+        failed_marker = os.path.join(self.cache_dir, f"{fmt_name}.failed")
+        try:
+            if time.time() - os.path.getmtime(failed_marker) < _FORMAT_RETRY_AFTER:
+                return None
+        except OSError:
+            pass  # No marker: build the format
+        
+        # Build under a unique job name so concurrent workers never clobber each other
+        job_name = f"{fmt_name}_{os.getpid()}_{threading.get_ident()}"
+        ini_file = os.path.join(self.cache_dir, f"{job_name}.ltx")
+        try:
+            with open(ini_file, 'w', encoding='utf-8') as f:
+                f.write(preamble + '\\dump\n')
+            with _TEX_SLOTS:
+                result = subprocess.run([
+                    self.latex_compiler,
+                    '-ini',
+                    f'-jobname={job_name}',
+                    '-interaction=nonstopmode',
+                    '-halt-on-error',
+                    f'&{self.latex_compiler}',
+                    ini_file
+                ], capture_output=True, text=True, timeout=120, cwd=self.cache_dir)
+            built = os.path.join(self.cache_dir, f"{job_name}.fmt")
+            if result.returncode != 0 or not os.path.exists(built):
+                open(failed_marker, 'w').close()
+                return None
+            os.replace(built, os.path.join(self.cache_dir, f"{fmt_name}.fmt"))
+            return fmt_name
+        except Exception:
+            return None
+        finally:
+            for ext in ['.ltx', '.log', '.fmt']:
+                temp_file = os.path.join(self.cache_dir, f"{job_name}{ext}")
                 if os.path.exists(temp_file):
                     os.remove(temp_file)
-            raise e
+    
+    def _discard_format(self, fmt_name: str) -> None:
+        """Drop a format that fails to load so it isn't retried until _FORMAT_RETRY_AFTER passes"""
+        try:
+            fmt_file = os.path.join(self.cache_dir, f"{fmt_name}.fmt")
+            if os.path.exists(fmt_file):
+                os.remove(fmt_file)
+            open(os.path.join(self.cache_dir, f"{fmt_name}.failed"), 'w').close()
+        except Exception:
+            pass
     
     def _generate_pdf_from_html(self, latex_source: str, output_name: str) -> str:
         """Fallback: Convert LaTeX-like content to HTML then PDF using xhtml2pdf"""
         # Convert LaTeX to HTML-like format
         html_content = self._latex_to_html(latex_source)
 
+        pisa = _pisa()
         if pisa is None:
             raise Exception(
                 "xhtml2pdf is not installed. Install with 'pip install xhtml2pdf' to enable PDF generation without wkhtmltopdf."
             )
 
         pdf_file = os.path.join(self.temp_dir, f"{output_name}.pdf")
-        # Write intermediate HTML for debugging/inspection
-        try:
-            html_debug_path = os.path.join(self.temp_dir, f"{output_name}.html")
-            with open(html_debug_path, 'w', encoding='utf-8') as hf:
-                hf.write(html_content)
-        except Exception:
-            pass
+        # Write intermediate HTML for debugging/inspection (debug mode only)
+        if has_app_context() and current_app.debug:
+            try:
+                html_debug_path = os.path.join(self.temp_dir, f"{output_name}.html")
+                with open(html_debug_path, 'w', encoding='utf-8') as hf:
+                    hf.write(html_content)
+            except Exception:
+                pass
         try:
-            with open(pdf_file, 'wb') as out_f:
+            # Large buffer so xhtml2pdf's many small writes become a few syscalls
+            with io.BufferedWriter(io.FileIO(pdf_file, 'w'), buffer_size=64 * 1024) as out_f:
                 result = pisa.CreatePDF(src=html_content, dest=out_f, encoding='utf-8')
             if result.err:
                 raise Exception("xhtml2pdf failed to generate PDF")
@@ -164,66 +675,8 @@ class PDFGenerator:
     def _latex_to_html(self, latex_source: str) -> str:
         """Convert basic LaTeX to HTML for PDF generation.
         If no LaTeX document markers are present, treat entire input as body text."""
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body { 
-                    font-family: 'Times New Roman', serif; 
-                    font-size: 11pt; 
-                    line-height: 1.4; 
-                    margin: 0; 
-                    padding: 20px;
-                }
-                .header { 
-                    text-align: center; 
-                    margin-bottom: 20px; 
-                    border-bottom: 2px solid #333;
-                    padding-bottom: 10px;
-                }
-                .name { 
-                    font-size: 18pt; 
-                    font-weight: bold; 
-                    margin-bottom: 5px; 
-                }
-                .contact { 
-                    font-size: 10pt; 
-                    color: #666; 
-                }
-                .section { 
-                    margin: 15px 0; 
-                }
-                .section-title { 
-                    font-size: 12pt; 
-                    font-weight: bold; 
-                    text-transform: uppercase; 
-                    border-bottom: 1px solid #333; 
-                    margin-bottom: 8px; 
-                    padding-bottom: 2px;
-                }
-                .item { 
-                    margin: 8px 0; 
-                }
-                .item-title { 
-                    font-weight: bold; 
-                    margin-bottom: 3px; 
-                }
-                .item-details { 
-                    margin-left: 15px; 
-                }
-                ul { 
-                    margin: 5px 0; 
-                    padding-left: 20px; 
-                }
-                li { 
-                    margin: 2px 0; 
-                }
-            </style>
-        </head>
-        <body>
-        """
+        parts = [_HTML_HEAD]
+        append = parts.append
         
         # Parse LaTeX content and convert to HTML
         lines = latex_source.split('\n')
@@ -247,45 +700,45 @@ class PDFGenerator:
             # Parse LaTeX commands
             if '\\name{' in line:
                 name = self._extract_latex_content(line, '\\name{')
-                html += f'<div class="header"><div class="name">{name}</div>'
+                append(f'<div class="header"><div class="name">{name}</div>')
                 any_content = True
             elif '\\phone' in line or '\\email' in line or '\\social' in line:
                 contact = self._extract_latex_content(line, '{')
-                html += f'<div class="contact">{contact}</div>'
+                append(f'<div class="contact">{contact}</div>')
             elif '\\makecvtitle' in line:
-                html += '</div>'  # Close header
+                append('</div>')  # Close header
             elif '\\section{' in line:
                 if current_section:
-                    html += '</div>'  # Close previous section
+                    append('</div>')  # Close previous section
                 section_title = self._extract_latex_content(line, '\\section{')
-                html += f'<div class="section"><div class="section-title">{section_title}</div>'
+                append(f'<div class="section"><div class="section-title">{section_title}</div>')
                 current_section = section_title
                 any_content = True
             elif '\\cventry{' in line:
                 # Extract entry content (simplified)
                 content = line.replace('\\cventry{', '').replace('}', '')
-                html += f'<div class="item"><div class="item-title">{content}</div></div>'
+                append(f'<div class="item"><div class="item-title">{content}</div></div>')
                 any_content = True
             elif '\\item ' in line:
                 item_content = line.replace('\\item ', '')
-                html += f'<li>{item_content}</li>'
+                append(f'<li>{item_content}</li>')
                 any_content = True
             elif line and not line.startswith('\\'):
-                html += f'<p>{line}</p>'
+                append(f'<p>{line}</p>')
                 any_content = True
         
         if current_section:
-            html += '</div>'  # Close last section
+            append('</div>')  # Close last section
         
         # Fallback: if nothing was parsed/added, render entire input as paragraphs
         if not any_content:
             body = '\n'.join(l for l in lines if l.strip())
             # Simple paragraphization
             paras = ''.join(f'<p>{line.strip()}</p>' for line in body.split('\n'))
-            html += paras
+            append(paras)
 
-        html += '</body></html>'
-        return html
+        append('</body></html>')
+        return ''.join(parts)
     
     def _extract_latex_content(self, line: str, command: str) -> str:
         """Extract content from LaTeX command"""
@@ -294,20 +747,25 @@ class PDFGenerator:
             return ""
         
         start += len(command)
-        brace_count = 0
-        content = ""
+        end = line.find('}', start)
+        if end == -1:
+            end = len(line)
+        if line.find('{', start, end) == -1:
+            # Common flat case: no nested group before the closing brace
+            return line[start:end].strip()
         
-        for char in line[start:]:
-            if char == '{':
-                brace_count += 1
-            elif char == '}':
-                if brace_count == 0:
-                    break
-                brace_count -= 1
+        # Nested groups: walk brace tokens to the matching close; inner braces are dropped
+        depth = 0
+        end = len(line)
+        for match in _BRACE_RE.finditer(line, start):
+            if match.group() == '{':
+                depth += 1
+            elif depth == 0:
+                end = match.start()
+                break
             else:
-                content += char
-        
-        return content.strip()
+                depth -= 1
+        return line[start:end].translate(_STRIP_BRACES).strip()
     
     def cleanup_temp_files(self, file_path: str):
         """Clean up temporary files"""
@@ -1,8 +1,16 @@
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 import re
+import sys
 
-SKILL_CANDIDATES = {
+# Optional dependency: pyahocorasick (C automaton for multi-pattern matching)
+try:
+    import ahocorasick
+except Exception:  # pragma: no cover
+    ahocorasick = None
+
+# Read-only; interned so matches compare by identity before falling back to __eq__
+SKILL_CANDIDATES = frozenset(sys.intern(s) for s in (
     # Core technical domains
     "python", "java", "javascript", "typescript", "go", "rust", "c++", "c#",
     "sql", "nosql", "postgres", "mysql", "mongodb", "redis",
@@ -10,7 +18,28 @@ SKILL_CANDIDATES = {
     "react", "vue", "angular", "node", "django", "flask", "fastapi", "spring",
     "pandas", "numpy", "pytorch", "tensorflow", "scikit-learn", "llm", "nlp",
     "graphql", "rest", "microservices", "event-driven", "kafka",
-}
+))
+
+# One pass over the text for all candidates; longest first so "c++" wins over shorter
+# prefixes. Lookarounds instead of \b so skills ending in symbols (c++, c#) can match.
+_SKILL_RE = re.compile(
+    r"(?<!\w)(" + "|".join(re.escape(s) for s in sorted(SKILL_CANDIDATES, key=len, reverse=True)) + r")(?!\w)"
+)
+
+
+def _build_automaton():
+    automaton = ahocorasick.Automaton()
+    for skill in SKILL_CANDIDATES:
+        automaton.add_word(skill, skill)
+    automaton.make_automaton()
+    return automaton
+
+
+_SKILL_AUTOMATON = _build_automaton() if ahocorasick is not None else None
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
 
 class SkillSource(BaseModel):
     skill: str
@@ -29,11 +58,21 @@ def _normalize(text: str) -> str:
 
 def _extract_skills_from_text(text: str) -> List[str]:
     t = _normalize(text)
-    found = []
-    for sk in SKILL_CANDIDATES:
-        if re.search(rf"\b{re.escape(sk)}\b", t):
-            found.append(sk)
-    return found
+    if _SKILL_AUTOMATON is None:
+        # Unique skills in order of first appearance, as the canonical interned strings
+        return list(dict.fromkeys(sys.intern(m.group(1)) for m in _SKILL_RE.finditer(t)))
+    
+    # Single automaton pass; keep matches that aren't part of a larger word
+    found = {}
+    last = len(t) - 1
+    for end, skill in _SKILL_AUTOMATON.iter(t):
+        start = end - len(skill) + 1
+        if start > 0 and _is_word_char(t[start - 1]):
+            continue
+        if end < last and _is_word_char(t[end + 1]):
+            continue
+        found.setdefault(skill, None)
+    return list(found)
 
 
 def aggregate_skills_from_web(web_results: List[Dict[str, Any]]) -> RecommendedSkillsBundle:
@@ -42,12 +81,13 @@ def aggregate_skills_from_web(web_results: List[Dict[str, Any]]) -> RecommendedS
 
     for item in web_results or []:
         snippet = item.get("snippet") or ""
-        url = item.get("url") or ""
-        src = item.get("source") or "web"
+        url = str(item.get("url") or "")
+        src = str(item.get("source") or "web")
         extracted = _extract_skills_from_text(snippet)
         for sk in extracted:
             if sk not in skills_set:
                 skills_set.add(sk)
-                sources.append(SkillSource(skill=sk, url=url, snippet=snippet[:300], source=src))
+                # Fields are already plain strings, so skip per-instance validation
+                sources.append(SkillSource.model_construct(skill=sk, url=url, snippet=snippet[:300], source=src))
 
-    return RecommendedSkillsBundle(skills=sorted(skills_set), sources=sources)
+    return RecommendedSkillsBundle.model_construct(skills=sorted(skills_set), sources=sources)
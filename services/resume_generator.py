@@ -1,14 +1,21 @@
-import openai
 import json
 import logging
 from typing import Dict, Any
 from services.resume_schema import ResumeData
 from flask import current_app
 
+# Function schema generated from the Pydantic model once; it never changes at runtime
+_FUNCTION_SCHEMA = {
+    "name": "generate_resume_content",
+    "description": "Generate structured resume content tailored to a job description",
+    "parameters": ResumeData.model_json_schema()
+}
+
 class ResumeContentGenerator:
     """Generate resume content using OpenAI function calling with Pydantic schemas."""
     
     def __init__(self):
+        import openai  # deferred: only needed once a generator is actually built
         self.client = openai.OpenAI(api_key=current_app.config.get('OPENAI_API_KEY'))
     
     def generate_resume_content(self, job_description: str, existing_resume_text: str = "") -> ResumeData:
@@ -23,13 +30,6 @@ class ResumeContentGenerator:
             ResumeData: Structured resume data
         """
         try:
-            # Create the function schema from Pydantic model
-            function_schema = {
-                "name": "generate_resume_content",
-                "description": "Generate structured resume content tailored to a job description",
-                "parameters": ResumeData.model_json_schema()
-            }
-            
             # Prepare the prompt
             system_prompt = """You are an expert resume writer. Generate comprehensive resume content based on the job description and existing resume information provided. 
 
@@ -59,7 +59,7 @@ Please generate a complete, tailored resume structure that matches this job desc
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                functions=[function_schema],
+                functions=[_FUNCTION_SCHEMA],
                 function_call={"name": "generate_resume_content"},
                 temperature=0.7
             )
@@ -1,10 +1,134 @@
 import os
-import PyPDF2
-import pdfplumber
-from docx import Document
 import re
+import zipfile
+from xml.etree import ElementTree
+from functools import lru_cache
 from typing import Optional
 
+# Parser libraries are heavy to import, so each is loaded on first use of its format
+
+
+@lru_cache(maxsize=1)
+def _pdfplumber():
+    import pdfplumber
+    return pdfplumber
+
+
+@lru_cache(maxsize=1)
+def _pypdf2():
+    import PyPDF2
+    return PyPDF2
+
+
+@lru_cache(maxsize=1)
+def _docx_document():
+    from docx import Document
+    return Document
+
+
+@lru_cache(maxsize=1)
+def _pdfium():
+    """Optional dependency: pypdfium2 (fast PDFium-based text extraction)"""
+    try:
+        import pypdfium2 as pdfium
+    except Exception:  # pragma: no cover
+        pdfium = None
+    return pdfium
+
+# WordprocessingML element names
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+# Run content as python-docx's Run.text renders it (w:br is handled separately)
+_W_RUN_TEXT = {_W + 'tab': '\t', _W + 'ptab': '\t', _W + 'cr': '\n', _W + 'noBreakHyphen': '-'}
+
+
+def _docx_run_text(run) -> str:
+    parts = []
+    for el in run:
+        if el.tag == _W + 't':
+            parts.append(el.text or '')
+        elif el.tag == _W + 'br':
+            # Page and column breaks don't produce text, only line breaks do
+            if el.get(_W + 'type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        else:
+            parts.append(_W_RUN_TEXT.get(el.tag, ''))
+    return ''.join(parts)
+
+
+def _docx_paragraph_text(paragraph) -> str:
+    """Text of the paragraph's runs, including runs inside hyperlinks.
+
+    Only run-level content is read, so w:pPr (tab stops etc.) is skipped, and only
+    the first branch of an mc:AlternateContent block is used so its content isn't
+    duplicated.
+    """
+    parts = []
+    for child in paragraph:
+        if child.tag == _W + 'r':
+            parts.append(_docx_run_text(child))
+        elif child.tag == _W + 'hyperlink':
+            parts.extend(_docx_run_text(run) for run in child.findall(_W + 'r'))
+        elif child.tag == _MC + 'AlternateContent':
+            branch = child.find(_MC + 'Choice')
+            if branch is None:
+                branch = child.find(_MC + 'Fallback')
+            if branch is not None:
+                parts.append(_docx_paragraph_text(branch))
+    return ''.join(parts)
+
+
+def _docx_xml_text(file_path: str) -> str:
+    """Body text of a .docx in document order: one line per paragraph, one per table row"""
+    with zipfile.ZipFile(file_path) as archive:
+        root = ElementTree.fromstring(archive.read('word/document.xml'))
+    body = root.find(_W + 'body')
+    if body is None:
+        raise ValueError("DOCX has no document body")
+    
+    parts = []
+    for block in body:
+        if block.tag == _W + 'p':
+            parts.append(_docx_paragraph_text(block) + "\n")
+        elif block.tag == _W + 'tbl':
+            for row in block.iter(_W + 'tr'):
+                cells = (
+                    '\n'.join(_docx_paragraph_text(p) for p in cell.findall(_W + 'p'))
+                    for cell in row.findall(_W + 'tc')
+                )
+                parts.append(' '.join(cells) + " \n")
+        else:
+            # Content controls and similar wrappers still hold ordinary paragraphs
+            parts.extend(_docx_paragraph_text(p) + "\n" for p in block.iter(_W + 'p'))
+    return ''.join(parts)
+
+# Text cleanup in a single pass: blank-line runs, space runs and special characters,
+# replaced by group number (see _CLEAN_REPL). Carriage returns are normalised after
+# the pass, as before, so stripping a character next to one can't add a line break.
+_RE_CLEAN = re.compile(
+    r'(\n\s*\n)'
+    r'|( {2,})'
+    r'|([^\w\s\-\.\,\(\)\[\]\@\#\$\%\&\*\+\=\:\;\!\?\'\"\n])'
+)
+_CLEAN_REPL = (None, '\n\n', ' ', '')
+
+# Contact-info patterns; phone patterns are tried in priority order
+_RE_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_RE_PHONES = (
+    re.compile(r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b'),
+    re.compile(r'\(\d{3}\)\s*\d{3}[-.\s]?\d{4}'),
+    re.compile(r'\+\d{1,3}[-.\s]?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}')
+)
+_RE_LINKEDIN = re.compile(r'linkedin\.com/in/[\w-]+')
+_RE_GITHUB = re.compile(r'github\.com/[\w-]+')
+
+# Year, Month/Year or "Mon Year": every one of these contains a standalone 4-digit
+# year, so matching that alone finds the same dates
+_RE_DATE = re.compile(r'\b\d{4}\b')
+
+# Common resume section names, matched anywhere (as substrings) in one pass
+_RE_SECTIONS = re.compile(r'experience|education|skills|work|employment|projects', re.IGNORECASE)
+
 class ResumeProcessor:
     """Service for processing and extracting text from resume files"""
     
@@ -29,51 +153,87 @@ class ResumeProcessor:
     
     def _extract_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF file using multiple methods for better accuracy"""
-        text = ""
+        # Try pypdfium2 first when installed (C++ PDFium extraction, much faster)
+        pdfium = _pdfium()
+        if pdfium is not None:
+            try:
+                text = self._extract_with_pdfium(pdfium, file_path)
+                if text.strip():
+                    return self._clean_text(text)
+            except Exception as e:
+                print(f"pypdfium2 failed: {e}")
+        
+        parts = []
         
-        # Try pdfplumber first (better for complex layouts)
+        # pdfplumber (better for complex layouts), with a per-page PyPDF2 fallback
+        # for pages it returns nothing for
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
+            with _pdfplumber().open(file_path) as pdf, open(file_path, 'rb') as file:
+                pypdf_reader = None
+                for index, page in enumerate(pdf.pages):
                     page_text = page.extract_text()
+                    if not page_text:
+                        try:
+                            if pypdf_reader is None:
+                                pypdf_reader = _pypdf2().PdfReader(file)
+                            page_text = pypdf_reader.pages[index].extract_text()
+                        except Exception:
+                            page_text = None
                     if page_text:
-                        text += page_text + "\n"
+                        parts.append(page_text)
         except Exception as e:
             print(f"pdfplumber failed: {e}")
             
         # Fallback to PyPDF2 if pdfplumber fails or returns empty
-        if not text.strip():
+        if not any(part.strip() for part in parts):
+            parts = []
             try:
                 with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
+                    pdf_reader = _pypdf2().PdfReader(file)
                     for page in pdf_reader.pages:
                         page_text = page.extract_text()
                         if page_text:
-                            text += page_text + "\n"
+                            parts.append(page_text)
             except Exception as e:
                 print(f"PyPDF2 failed: {e}")
                 raise ValueError("Could not extract text from PDF file")
         
-        return self._clean_text(text)
+        return self._clean_text(''.join(part + "\n" for part in parts))
+    
+    def _extract_with_pdfium(self, pdfium, file_path: str) -> str:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                page_text = textpage.get_text_range()
+                textpage.close()
+                page.close()
+                if page_text:
+                    parts.append(page_text)
+            return ''.join(part + "\n" for part in parts)
+        finally:
+            pdf.close()
     
     def _extract_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX file"""
+        # Read word/document.xml straight from the zip; much cheaper than building
+        # python-docx's object model, which stays as the fallback
         try:
-            doc = Document(file_path)
-            text = ""
-            
-            # Extract text from paragraphs
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+            return self._clean_text(_docx_xml_text(file_path))
+        except Exception:
+            pass
+        
+        try:
+            doc = _docx_document()(file_path)
             
-            # Extract text from tables
+            # Extract text from paragraphs, then from tables one row per line
+            parts = [paragraph.text + "\n" for paragraph in doc.paragraphs]
             for table in doc.tables:
                 for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
+                    parts.append(' '.join(cell.text for cell in row.cells) + " \n")
             
-            return self._clean_text(text)
+            return self._clean_text(''.join(parts))
             
         except Exception as e:
             raise ValueError(f"Could not extract text from DOCX file: {str(e)}")
@@ -98,14 +258,9 @@ class ResumeProcessor:
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
-        
-        # Remove special characters that might cause issues
-        text = re.sub(r'[^\w\s\-\.\,\(\)\[\]\@\#\$\%\&\*\+\=\:\;\!\?\'\"\n]', '', text)
-        
-        # Normalize line breaks
+        # Collapse whitespace and drop special characters that might cause issues,
+        # then normalize line breaks
+        text = _RE_CLEAN.sub(lambda m: _CLEAN_REPL[m.lastindex], text)
         text = text.replace('\r\n', '\n').replace('\r', '\n')
         
         return text.strip()
@@ -118,22 +273,23 @@ class ResumeProcessor:
             'suggestions': []
         }
         
-        text_lower = text.lower()
-        
         # Check minimum length
         if len(text.split()) < 50:
             validation['warnings'].append("Resume appears to be very short")
         
         # Check for common resume sections
-        resume_sections = ['experience', 'education', 'skills', 'work', 'employment', 'projects']
-        sections_found = sum(1 for section in resume_sections if section in text_lower)
+        sections_found = set()
+        for match in _RE_SECTIONS.finditer(text):
+            sections_found.add(match.group().lower())
+            if len(sections_found) >= 2:
+                break
         
-        if sections_found < 2:
+        if len(sections_found) < 2:
             validation['warnings'].append("Resume may be missing common sections (Experience, Education, Skills)")
         
         # Check for contact information
         has_email = '@' in text and '.' in text
-        has_phone = bool(re.search(r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b', text))
+        has_phone = bool(_RE_PHONES[0].search(text))
         
         if not has_email:
             validation['suggestions'].append("Consider adding email address")
@@ -141,13 +297,7 @@ class ResumeProcessor:
             validation['suggestions'].append("Consider adding phone number")
         
         # Check for dates (employment history)
-        date_patterns = [
-            r'\b\d{4}\b',  # Year
-            r'\b\d{1,2}/\d{4}\b',  # Month/Year
-            r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}\b'  # Month Year
-        ]
-        
-        has_dates = any(re.search(pattern, text) for pattern in date_patterns)
+        has_dates = bool(_RE_DATE.search(text))
         if not has_dates:
             validation['suggestions'].append("Consider adding employment dates")
         
@@ -158,30 +308,25 @@ class ResumeProcessor:
         contact_info = {}
         
         # Extract email
-        email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
+        email_match = _RE_EMAIL.search(text)
         if email_match:
             contact_info['email'] = email_match.group()
         
         # Extract phone number
-        phone_patterns = [
-            r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',
-            r'\(\d{3}\)\s*\d{3}[-.\s]?\d{4}',
-            r'\+\d{1,3}[-.\s]?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}'
-        ]
-        
-        for pattern in phone_patterns:
-            phone_match = re.search(pattern, text)
+        for pattern in _RE_PHONES:
+            phone_match = pattern.search(text)
             if phone_match:
                 contact_info['phone'] = phone_match.group()
                 break
         
         # Extract LinkedIn profile
-        linkedin_match = re.search(r'linkedin\.com/in/[\w-]+', text.lower())
+        text_lower = text.lower()
+        linkedin_match = _RE_LINKEDIN.search(text_lower)
         if linkedin_match:
             contact_info['linkedin'] = linkedin_match.group()
         
         # Extract GitHub profile
-        github_match = re.search(r'github\.com/[\w-]+', text.lower())
+        github_match = _RE_GITHUB.search(text_lower)
         if github_match:
             contact_info['github'] = github_match.group()
         
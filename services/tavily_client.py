@@ -1,6 +1,36 @@
 from typing import List, Dict, Any, Optional
 import os
+import json
+import threading
+from functools import lru_cache
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from services._async_loop import on_shared_loop, run_sync
+
+# Optional dependency: cachetools (TTL memo of recent searches)
+try:
+    from cachetools import TTLCache
+except Exception:  # pragma: no cover
+    TTLCache = None
+
+# Optional dependency: orjson (faster JSON encoding of request bodies)
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_ASYNC_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+_SEARCH_CACHE_TTL = 600
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
 
 class TavilyClient:
     """Thin wrapper around Tavily Search API."""
@@ -8,30 +38,112 @@ class TavilyClient:
     def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.tavily.com"):
         self.api_key = api_key or os.getenv("TAVILY_API_KEY")
         self.base_url = base_url.rstrip("/")
+        self._url = f"{self.base_url}/search"
+        # Request fields that never change between searches
+        self._base_payload = {"api_key": self.api_key, "search_depth": "basic"}
+        # Keep-alive pool so repeated searches reuse the TCP/TLS connection
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            # Searches are read-only, so retrying the POST on transient failures is safe
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(429, 502, 503, 504),
+                              allowed_methods=frozenset({"POST"}))
+        ))
+
+        # Async pool is created on first use, on the shared loop it stays bound to
+        self._aclient: Optional[httpx.AsyncClient] = None
+
+        # Repeated identical searches within a few minutes are answered locally
+        self._cache = TTLCache(maxsize=512, ttl=_SEARCH_CACHE_TTL) if TTLCache is not None else None
+        self._cache_lock = threading.Lock()
+
+    def close(self) -> None:
+        self._session.close()
+        if self._aclient is not None:
+            run_sync(self._aclient.aclose())
+            self._aclient = None
+
+    def __enter__(self) -> "TavilyClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _payload(self, query: str, max_results: int) -> Dict[str, Any]:
+        if not 1 <= max_results <= 10:
+            max_results = max(1, min(max_results, 10))
+        return {**self._base_payload, "query": query, "max_results": max_results}
+
+    def _cached(self, key) -> Optional[List[Dict[str, Any]]]:
+        if self._cache is None:
+            return None
+        with self._cache_lock:
+            items = self._cache.get(key)
+        return list(items) if items is not None else None
+
+    def _remember(self, key, items: List[Dict[str, Any]]) -> None:
+        # Empty results may be a transient failure, so only real answers are kept
+        if self._cache is None or not items:
+            return
+        with self._cache_lock:
+            self._cache[key] = items
+
+    @staticmethod
+    def _parse_results(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        results = data.get("results") or data.get("data") or []
+        items: List[Dict[str, Any]] = []
+        for item in results:
+            items.append({
+                "title": item.get("title") or item.get("name") or "",
+                "url": item.get("url") or item.get("link") or "",
+                "snippet": item.get("snippet") or item.get("content") or "",
+                "source": item.get("source") or "web"
+            })
+        return items
 
     def search_jobs(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         if not self.api_key:
             return []
-        url = f"{self.base_url}/search"
-        payload = {
-            "api_key": self.api_key,
-            "query": query,
-            "search_depth": "basic",
-            "max_results": max(1, min(max_results, 10))
-        }
+        payload = self._payload(query, max_results)
+        key = (query, payload["max_results"])
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
         try:
-            resp = requests.post(url, json=payload, timeout=15)
+            resp = self._session.post(self._url, data=_dumps(payload), headers=_JSON_HEADERS, timeout=15)
             resp.raise_for_status()
-            data = resp.json() or {}
-            results = data.get("results") or data.get("data") or []
-            items: List[Dict[str, Any]] = []
-            for item in results:
-                items.append({
-                    "title": item.get("title") or item.get("name") or "",
-                    "url": item.get("url") or item.get("link") or "",
-                    "snippet": item.get("snippet") or item.get("content") or "",
-                    "source": item.get("source") or "web"
-                })
-            return items
+            items = self._parse_results(resp.json() or {})
+        except Exception:
+            return []
+        self._remember(key, items)
+        return list(items)
+
+    async def _apost(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(timeout=15, limits=_ASYNC_LIMITS)
+        resp = await self._aclient.post(self._url, content=_dumps(payload), headers=_JSON_HEADERS)
+        resp.raise_for_status()
+        return resp.json() or {}
+
+    async def asearch_jobs(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """Async search_jobs; many queries can run concurrently with asyncio.gather"""
+        if not self.api_key:
+            return []
+        payload = self._payload(query, max_results)
+        key = (query, payload["max_results"])
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        try:
+            items = self._parse_results(await on_shared_loop(self._apost(payload)))
         except Exception:
             return []
+        self._remember(key, items)
+        return list(items)
+
+
+@lru_cache(maxsize=4)
+def get_tavily_client(api_key: Optional[str] = None) -> TavilyClient:
+    """Shared client per API key, so its connection pool and search cache stay warm across requests"""
+    return TavilyClient(api_key=api_key)
@@ -0,0 +1,31 @@
+# Optional dependency: tiktoken for exact token counts
+try:
+    import tiktoken
+    _ENC = tiktoken.encoding_for_model("gpt-3.5-turbo")
+except Exception:  # pragma: no cover
+    _ENC = None
+
+# Rough chars-per-token ratio for English text when tiktoken is unavailable
+_CHARS_PER_TOKEN = 4
+
+# gpt-3.5-turbo context window
+CONTEXT_WINDOW = 16385
+
+
+def count_tokens(text: str) -> int:
+    """Token count for gpt-3.5-turbo, estimated at ~4 chars/token without tiktoken"""
+    if _ENC is not None:
+        return len(_ENC.encode(text))
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def fit(text: str, budget: int) -> str:
+    """Truncate text to at most budget tokens"""
+    if not text or budget <= 0:
+        return ""
+    if _ENC is None:
+        return text[:budget * _CHARS_PER_TOKEN]
+    tokens = _ENC.encode(text)
+    if len(tokens) <= budget:
+        return text
+    return _ENC.decode(tokens[:budget])
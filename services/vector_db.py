@@ -1,9 +1,169 @@
 import os
+import asyncio
+import hashlib
+import time
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from pinecone import Pinecone, ServerlessSpec
 import google.generativeai as genai
 import numpy as np
-from typing import List, Dict, Any, Optional
-import json
+from typing import List, Dict, Any, Optional, Tuple
+
+# Optional dependency: diskcache (persistent embedding cache shared across processes)
+try:
+    import diskcache
+except Exception:  # pragma: no cover
+    diskcache = None
+
+_EMBEDDING_TASK_TYPE = "retrieval_document"
+
+# Cached embeddings are kept as float16: half the memory and disk of float32 with
+# ~1e-3 relative error per component, which doesn't change similarity rankings.
+# Pinecone itself always stores float32, so values are widened again on upsert.
+_CACHE_DTYPE = np.float16
+
+# Request size limits: Google AI batch embeddings and Pinecone upserts
+_EMBED_BATCH_SIZE = 100
+_UPSERT_BATCH_SIZE = 100
+_FETCH_BATCH_SIZE = 100
+
+# Bulk loads: background upsert threads and how many upsert jobs may queue up
+_UPSERT_WORKERS = 4
+_UPSERT_QUEUE_DEPTH = 4
+
+# Users with at most this many vectors of a kind are searched in-process instead of
+# querying Pinecone; loaded copies are refreshed after _LOCAL_INDEX_TTL seconds so
+# writes from other processes show up
+_LOCAL_INDEX_MAX = 1000
+_LOCAL_INDEX_TTL = 300
+
+
+def _user_namespace(user_id: Optional[int]) -> str:
+    """Each user's vectors live in their own namespace so queries search only that partition"""
+    return f"user_{user_id}" if user_id else ""
+
+
+@lru_cache(maxsize=1)
+def _embedding_store():
+    """Open the on-disk embedding cache, or None if diskcache is unavailable"""
+    if diskcache is None:
+        return None
+    try:
+        return diskcache.Cache(
+            os.environ.get('EMBEDDING_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ai_resume_embeddings')),
+            size_limit=512 * 1024 ** 2,
+            eviction_policy='least-recently-used'
+        )
+    except Exception:
+        return None
+
+
+def _embedding_key(model: str, text: str) -> str:
+    # Model and task type are part of the key so vectors from different models never
+    # mix; "unit" marks entries that are stored L2-normalised
+    return hashlib.sha256(f"{model}\0{_EMBEDDING_TASK_TYPE}\0unit\0{text}".encode('utf-8')).hexdigest()
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _unit_vector(values) -> np.ndarray:
+    """L2-normalise an embedding once at write time, so dot product equals cosine similarity"""
+    embedding = np.asarray(values, dtype=np.float32)
+    norm = np.linalg.norm(embedding)
+    if norm > 0:
+        embedding /= norm
+    return embedding.astype(_CACHE_DTYPE)
+
+
+def _load_embedding(key: str) -> Optional[np.ndarray]:
+    store = _embedding_store()
+    if store is None:
+        return None
+    try:
+        return store.get(key)
+    except Exception:
+        return None
+
+
+def _save_embedding(key: str, embedding: np.ndarray) -> None:
+    store = _embedding_store()
+    if store is None:
+        return
+    try:
+        store.set(key, embedding)
+    except Exception:
+        pass  # Caching is best effort
+
+
+@lru_cache(maxsize=2048)
+def _cached_embedding(model: str, text: str) -> np.ndarray:
+    """Embedding for text: in-process LRU, then the disk cache, then the Google AI API.
+
+    Raises on API failure so errors are never cached. The returned array is
+    shared between callers and therefore read-only.
+    """
+    key = _embedding_key(model, text)
+    embedding = _load_embedding(key)
+    if embedding is None:
+        result = genai.embed_content(
+            model=model,
+            content=text,
+            task_type=_EMBEDDING_TASK_TYPE
+        )
+        embedding = _unit_vector(result['embedding'])
+        _save_embedding(key, embedding)
+    
+    embedding.flags.writeable = False
+    return embedding
+
+
+class _LocalIndex:
+    """Exact cosine search over one user's vectors of one kind, held as a normalised matrix"""
+    
+    def __init__(self, ids: List[str], vectors, metadatas: List[Dict[str, Any]], dimension: int):
+        self.ids = list(ids)
+        self.metadatas = list(metadatas)
+        self.matrix = self._normalise(np.asarray(vectors, dtype=np.float32).reshape(len(self.ids), dimension))
+        self.loaded_at = time.monotonic()
+    
+    @staticmethod
+    def _normalise(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    def search(self, query, top_k: int) -> List[Tuple[str, float, Dict[str, Any]]]:
+        k = min(top_k, len(self.ids))
+        if k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        if not query.any():
+            return []  # failed embedding; Pinecone would reject it too
+        query = self._normalise(query)
+        scores = self.matrix @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i]), self.metadatas[i]) for i in top]
+    
+    def upsert(self, vector_id: str, vector, metadata: Dict[str, Any]) -> None:
+        row = self._normalise(np.asarray(vector, dtype=np.float32))
+        self.remove(vector_id)
+        self.ids.append(vector_id)
+        self.metadatas.append(metadata)
+        self.matrix = np.vstack([self.matrix, row])
+    
+    def remove(self, vector_id: str) -> None:
+        if vector_id in self.ids:
+            i = self.ids.index(vector_id)
+            del self.ids[i]
+            del self.metadatas[i]
+            self.matrix = np.delete(self.matrix, i, axis=0)
+
 
 class PineconeVectorDB:
     """Pinecone vector database service for semantic search and embeddings"""
@@ -29,132 +189,239 @@ class PineconeVectorDB:
         self.embedding_model_name = os.environ.get('EMBEDDING_MODEL', 'models/embedding-001')
         self.vector_dimension = int(os.environ.get('VECTOR_DIMENSION', '768'))
         
-        # Create or connect to index
+        # The index is connected (and created if needed) on first use, not at import
         self.index_name = index_name
-        existing_indexes = [index.name for index in self.pc.list_indexes()]
+        self.environment = environment
+        self._index_lock = threading.Lock()
         
-        if index_name not in existing_indexes:
-            self.pc.create_index(
-                name=index_name,
-                dimension=self.vector_dimension,
-                metric='cosine',
-                spec=ServerlessSpec(
-                    cloud='aws',
-                    region=environment or 'us-east-1'
-                )
-            )
-        
-        self.index = self.pc.Index(index_name)
+        # (kind, user_id) -> in-process index, or None when the user has too many vectors
+        self._local_indexes: Dict[Tuple[str, int], Optional[_LocalIndex]] = {}
+        self._local_loaded_at: Dict[Tuple[str, int], float] = {}
+        self._local_lock = threading.Lock()
     
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for text using Google AI"""
-        try:
+    @cached_property
+    def index(self):
+        """Pinecone index handle; the existence check runs once per deployment"""
+        with self._index_lock:
+            # A marker file records that the index exists, so restarts skip list_indexes()
+            marker = os.path.join(tempfile.gettempdir(), f'.pinecone_index_exists_{self.index_name}')
+            auto_create = os.environ.get('PINECONE_AUTO_CREATE', '1') != '0'
+            if auto_create and not os.path.exists(marker):
+                existing_indexes = [index.name for index in self.pc.list_indexes()]
+                
+                if self.index_name not in existing_indexes:
+                    self.pc.create_index(
+                        name=self.index_name,
+                        dimension=self.vector_dimension,
+                        # Stored vectors are unit-norm, so 'dotproduct' ranks exactly like
+                        # 'cosine' without per-query normalisation on Pinecone's side
+                        metric=os.environ.get('PINECONE_METRIC', 'dotproduct'),
+                        spec=ServerlessSpec(
+                            cloud='aws',
+                            region=self.environment or 'us-east-1'
+                        )
+                    )
+                try:
+                    open(marker, 'a').close()
+                except OSError:
+                    pass
+            
+            return self.pc.Index(self.index_name)
+    
+    def generate_embedding(self, text: str) -> np.ndarray:
+        """Generate a float32 embedding for text using Google AI (zero vector if the call fails).
+
+        Convert with .tolist() only where an API needs Python floats.
+        """
+        return self._embedding_array(text).astype(np.float32)
+    
+    async def agenerate_embedding(self, text: str) -> np.ndarray:
+        """Async generate_embedding; the SDK call runs in a worker thread so gather() overlaps them"""
+        return await asyncio.to_thread(self.generate_embedding, text)
+    
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed many texts with one API call per 100 uncached texts.
+
+        Returns a (len(texts), dimension) float32 array, one row per text. Duplicate
+        texts are embedded once and texts already in the disk cache are not sent
+        again. Raises on API failure.
+        """
+        embeddings = np.empty((len(texts), self.vector_dimension), dtype=np.float32)
+        
+        # Identical texts (repeated postings, boilerplate) are looked up and embedded once
+        rows_by_key: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            rows_by_key.setdefault(_embedding_key(self.embedding_model_name, text), []).append(i)
+        
+        missing = []
+        for key, rows in rows_by_key.items():
+            cached = _load_embedding(key)
+            if cached is None:
+                missing.append(key)
+            else:
+                embeddings[rows] = cached
+        
+        for start in range(0, len(missing), _EMBED_BATCH_SIZE):
+            chunk = missing[start:start + _EMBED_BATCH_SIZE]
             result = genai.embed_content(
                 model=self.embedding_model_name,
-                content=text,
-                task_type="retrieval_document"
+                content=[texts[rows_by_key[key][0]] for key in chunk],
+                task_type=_EMBEDDING_TASK_TYPE
             )
-            return result['embedding']
-        except Exception as e:
-            print(f"Error generating embedding: {e}")
-            # Return zero vector as fallback
-            return [0.0] * self.vector_dimension
+            for key, values in zip(chunk, result['embedding']):
+                embedding = _unit_vector(values)
+                _save_embedding(key, embedding)
+                embeddings[rows_by_key[key]] = embedding
+        
+        return embeddings
     
-    def store_resume_embedding(self, resume_id: int, user_id: int, 
-                              resume_text: str, metadata: Dict[str, Any] = None) -> bool:
-        """Store resume embedding in Pinecone"""
+    def upsert_batch(self, vectors: List[Dict[str, Any]], namespace: str = "") -> None:
+        """Upsert vectors in as few requests as Pinecone's per-request limit allows"""
+        for start in range(0, len(vectors), _UPSERT_BATCH_SIZE):
+            self.index.upsert(vectors=vectors[start:start + _UPSERT_BATCH_SIZE], namespace=namespace)
+    
+    def _upsert_counted(self, vectors: List[Dict[str, Any]], namespace: str) -> int:
+        self.upsert_batch(vectors, namespace)
+        return len(vectors)
+    
+    def _vectors_by_namespace(self, kind: str, items: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Embed items and build their upsert payloads, grouped by user namespace"""
+        embeddings = self.embed_batch([item['text'] for item in items])
+        # Rows that aren't all zeros, found in one reduction over the whole matrix
+        nonzero = embeddings.any(axis=1)
+        
+        by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+        for item, embedding, keep in zip(items, embeddings, nonzero):
+            if not keep:
+                continue
+            by_namespace.setdefault(_user_namespace(item['user_id']), []).append({
+                'id': f"{kind}_{item['user_id']}_{item['id']}",
+                'values': embedding.tolist(),
+                'metadata': {
+                    'type': kind,
+                    f'{kind}_id': item['id'],
+                    'user_id': item['user_id'],
+                    'content_hash': _content_hash(item['text']),
+                    **(item.get('metadata') or {})
+                }
+            })
+        return by_namespace
+    
+    def store_embeddings(self, kind: str, items: List[Dict[str, Any]]) -> int:
+        """Bulk-store resume or job embeddings; returns how many vectors were upserted.
+
+        kind is 'resume' or 'job'; each item has 'id', 'user_id', 'text' and
+        optionally 'metadata', mirroring store_resume_embedding/store_job_embedding.
+        """
+        # Skip empty texts
+        items = [item for item in items if item.get('text') and item['text'].strip()]
+        if not items:
+            return 0
         try:
-            embedding = self.generate_embedding(resume_text)
+            stored = 0
+            # Embedding (Google) and upserting (Pinecone) hit different services, so
+            # chunk N is upserted in the background while chunk N+1 is embedded
+            with ThreadPoolExecutor(max_workers=_UPSERT_WORKERS, thread_name_prefix='pinecone-upsert') as pool:
+                pending = deque()
+                for start in range(0, len(items), _EMBED_BATCH_SIZE):
+                    chunk = items[start:start + _EMBED_BATCH_SIZE]
+                    for namespace, vectors in self._vectors_by_namespace(kind, chunk).items():
+                        pending.append(pool.submit(self._upsert_counted, vectors, namespace))
+                    # Bound the vectors held in memory while the upserts catch up
+                    while len(pending) > _UPSERT_QUEUE_DEPTH:
+                        stored += pending.popleft().result()
+                while pending:
+                    stored += pending.popleft().result()
             
-            # Create unique ID for the resume
-            vector_id = f"resume_{user_id}_{resume_id}"
-            
-            # Prepare metadata
-            vector_metadata = {
-                'type': 'resume',
-                'resume_id': resume_id,
-                'user_id': user_id,
-                'text_preview': resume_text[:200],  # First 200 chars for preview
-                **(metadata or {})
-            }
-            
-            # Skip if text is empty or embedding is all zeros
-            if not resume_text or not resume_text.strip():
-                print("Skipping embedding upsert: resume_text is empty")
-                return False
-            if not any(abs(v) > 1e-12 for v in embedding):
-                print(f"Skipping embedding upsert: embedding for {vector_id} is all zeros")
-                return False
-
-            # Upsert to Pinecone (dict format for v3 client)
-            self.index.upsert(vectors=[{
-                'id': vector_id,
-                'values': embedding,
-                'metadata': vector_metadata
-            }])
-            return True
+            # Reload in-process indexes of affected users on their next search
+            with self._local_lock:
+                for item in items:
+                    self._local_loaded_at.pop((kind, item['user_id']), None)
+            return stored
             
         except Exception as e:
             import traceback
-            print(f"Error storing resume embedding: {e}\n{traceback.format_exc()}")
-            return False
+            print(f"Error storing {kind} embeddings: {e}\n{traceback.format_exc()}")
+            return 0
     
-    def store_job_embedding(self, job_id: int, user_id: int, 
-                           job_text: str, metadata: Dict[str, Any] = None) -> bool:
-        """Store job description embedding in Pinecone"""
+    def _embedding_array(self, text: str) -> np.ndarray:
+        """Like generate_embedding but as a (read-only) array; zeros if the API call fails"""
         try:
-            embedding = self.generate_embedding(job_text)
+            return _cached_embedding(self.embedding_model_name, text)
+        except Exception as e:
+            print(f"Error generating embedding: {e}")
+            return np.zeros(self.vector_dimension, dtype=_CACHE_DTYPE)
+    
+    def _store_embedding(self, kind: str, obj_id: int, user_id: int,
+                         text: str, metadata: Optional[Dict[str, Any]]) -> bool:
+        """Embed text and upsert it as f"{kind}_{user_id}_{obj_id}" into the user's namespace"""
+        try:
+            # Skip if text is empty (before paying for an embedding)
+            if not text or not text.strip():
+                print(f"Skipping {kind} embedding upsert: text is empty")
+                return False
             
-            # Create unique ID for the job
-            vector_id = f"job_{user_id}_{job_id}"
+            embedding = self._embedding_array(text)
+            vector_id = f"{kind}_{user_id}_{obj_id}"
+            
+            # Skip if embedding is all zeros. Cached vectors are unit-norm float16, so
+            # components are either 0 or far above any tolerance: a plain any()
+            # reduction (no temporaries, stops at the first non-zero) is enough
+            if not embedding.any():
+                print(f"Skipping {kind} embedding upsert: embedding for {vector_id} is all zeros")
+                return False
             
             # Prepare metadata
             vector_metadata = {
-                'type': 'job',
-                'job_id': job_id,
+                'type': kind,
+                f'{kind}_id': obj_id,
                 'user_id': user_id,
-                'text_preview': job_text[:200],
+                # Previews come from the database row (see app.semantic_search);
+                # only a short hash travels with every query result
+                'content_hash': _content_hash(text),
                 **(metadata or {})
             }
-            
-            # Skip if text is empty or embedding is all zeros
-            if not job_text or not job_text.strip():
-                print("Skipping job embedding upsert: job_text is empty")
-                return False
-            if not any(abs(v) > 1e-12 for v in embedding):
-                print(f"Skipping job embedding upsert: embedding for {vector_id} is all zeros")
-                return False
 
             # Upsert to Pinecone (dict format for v3 client)
             self.index.upsert(vectors=[{
                 'id': vector_id,
-                'values': embedding,
+                'values': embedding.tolist(),
                 'metadata': vector_metadata
-            }])
+            }], namespace=_user_namespace(user_id))
+            
+            with self._local_lock:
+                local = self._local_indexes.get((kind, user_id))
+                if local is not None:
+                    local.upsert(vector_id, embedding, vector_metadata)
             return True
             
         except Exception as e:
             import traceback
-            print(f"Error storing job embedding: {e}\n{traceback.format_exc()}")
+            print(f"Error storing {kind} embedding: {e}\n{traceback.format_exc()}")
             return False
     
-    def find_similar_resumes(self, query_text: str, user_id: int = None, 
-                           top_k: int = 5) -> List[Dict[str, Any]]:
-        """Find similar resumes based on query text"""
+    def store_resume_embedding(self, resume_id: int, user_id: int, 
+                              resume_text: str, metadata: Dict[str, Any] = None) -> bool:
+        """Store resume embedding in Pinecone"""
+        return self._store_embedding('resume', resume_id, user_id, resume_text, metadata)
+    
+    def store_job_embedding(self, job_id: int, user_id: int, 
+                           job_text: str, metadata: Dict[str, Any] = None) -> bool:
+        """Store job description embedding in Pinecone"""
+        return self._store_embedding('job', job_id, user_id, job_text, metadata)
+    
+    def _find(self, kind: str, query_text: str, user_id: Optional[int], top_k: int) -> List[Dict[str, Any]]:
+        """Nearest vectors of one kind to query_text, within the user's namespace"""
         try:
             query_embedding = self.generate_embedding(query_text)
             
-            # Build filter for user-specific search
-            filter_dict = {'type': 'resume'}
-            if user_id:
-                filter_dict['user_id'] = user_id
-            
-            # Query Pinecone
+            # Query Pinecone; the user's namespace scopes the search
             results = self.index.query(
-                vector=query_embedding,
+                vector=query_embedding.tolist(),
                 top_k=top_k,
                 include_metadata=True,
-                filter=filter_dict
+                filter={'type': kind},
+                namespace=_user_namespace(user_id)
             )
             
             return [
@@ -167,40 +434,62 @@ class PineconeVectorDB:
             ]
             
         except Exception as e:
-            print(f"Error finding similar resumes: {e}")
+            print(f"Error finding similar {kind}s: {e}")
             return []
     
+    def find_similar_resumes(self, query_text: str, user_id: int = None, 
+                           top_k: int = 5) -> List[Dict[str, Any]]:
+        """Find similar resumes based on query text"""
+        return self._find('resume', query_text, user_id, top_k)
+    
     def find_similar_jobs(self, query_text: str, user_id: int = None, 
                          top_k: int = 5) -> List[Dict[str, Any]]:
         """Find similar job descriptions based on query text"""
-        try:
-            query_embedding = self.generate_embedding(query_text)
-            
-            # Build filter for user-specific search
-            filter_dict = {'type': 'job'}
-            if user_id:
-                filter_dict['user_id'] = user_id
-            
-            # Query Pinecone
-            results = self.index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                include_metadata=True,
-                filter=filter_dict
-            )
-            
-            return [
-                {
-                    'id': match.id,
-                    'score': match.score,
-                    'metadata': match.metadata
-                }
-                for match in results.matches
-            ]
-            
-        except Exception as e:
-            print(f"Error finding similar jobs: {e}")
-            return []
+        return self._find('job', query_text, user_id, top_k)
+    
+    def _local_index(self, kind: str, user_id: int) -> Optional[_LocalIndex]:
+        """In-process index of a user's vectors, loaded from Pinecone on first use.
+
+        Returns None when the user has more than _LOCAL_INDEX_MAX vectors of this
+        kind, in which case callers query Pinecone as usual.
+        """
+        key = (kind, user_id)
+        with self._local_lock:
+            loaded_at = self._local_loaded_at.get(key)
+            if loaded_at is not None and time.monotonic() - loaded_at < _LOCAL_INDEX_TTL:
+                return self._local_indexes.get(key)
+        
+        namespace = _user_namespace(user_id)
+        ids = []
+        for page in self.index.list(prefix=f"{kind}_{user_id}_", namespace=namespace):
+            ids.extend(page)
+            if len(ids) > _LOCAL_INDEX_MAX:
+                break
+        
+        local = None
+        if len(ids) <= _LOCAL_INDEX_MAX:
+            present, vectors, metadatas = [], [], []
+            for start in range(0, len(ids), _FETCH_BATCH_SIZE):
+                batch = ids[start:start + _FETCH_BATCH_SIZE]
+                fetched = self.index.fetch(ids=batch, namespace=namespace).vectors
+                for vector_id in batch:
+                    vector = fetched.get(vector_id)
+                    if vector is not None:
+                        present.append(vector_id)
+                        vectors.append(vector.values)
+                        metadatas.append(vector.metadata or {})
+            local = _LocalIndex(present, vectors, metadatas, self.vector_dimension)
+        
+        with self._local_lock:
+            self._local_indexes[key] = local
+            self._local_loaded_at[key] = local.loaded_at if local is not None else time.monotonic()
+        return local
+    
+    def _forget_local(self, kind: str, user_id: int, vector_id: str) -> None:
+        with self._local_lock:
+            local = self._local_indexes.get((kind, user_id))
+            if local is not None:
+                local.remove(vector_id)
     
     def find_matching_resumes_for_job(self, job_text: str, user_id: int, 
                                      top_k: int = 3) -> List[Dict[str, Any]]:
@@ -208,19 +497,42 @@ class PineconeVectorDB:
         try:
             job_embedding = self.generate_embedding(job_text)
             
+            # Small collections are searched in-process (same cosine scores, no round-trip).
+            # Loading uses index.list, which pod-based indexes don't support, so any
+            # failure here falls through to the regular Pinecone query.
+            local = matches = None
+            if user_id:
+                try:
+                    local = self._local_index('resume', user_id)
+                    if local is not None:
+                        with self._local_lock:
+                            matches = local.search(job_embedding, top_k)
+                except Exception as e:
+                    print(f"Local resume index unavailable, querying Pinecone: {e}")
+                    matches = None
+            if matches is not None:
+                return [
+                    {
+                        'resume_id': metadata.get('resume_id'),
+                        'similarity_score': score,
+                        'metadata': metadata
+                    }
+                    for _, score, metadata in matches
+                ]
+            
             # Search only user's resumes
             results = self.index.query(
-                vector=job_embedding,
+                vector=job_embedding.tolist(),
                 top_k=top_k,
                 include_metadata=True,
-                filter={'type': 'resume', 'user_id': user_id}
+                filter={'type': 'resume'},
+                namespace=_user_namespace(user_id)
             )
             
             return [
                 {
                     'resume_id': match.metadata.get('resume_id'),
                     'similarity_score': match.score,
-                    'text_preview': match.metadata.get('text_preview', ''),
                     'metadata': match.metadata
                 }
                 for match in results.matches
@@ -230,48 +542,42 @@ class PineconeVectorDB:
             print(f"Error finding matching resumes: {e}")
             return []
     
-    def delete_resume_embedding(self, resume_id: int, user_id: int) -> bool:
-        """Delete resume embedding from Pinecone"""
+    def _delete(self, kind: str, obj_id: int, user_id: int) -> bool:
+        """Delete one resume/job embedding from Pinecone and the in-process index"""
         try:
-            vector_id = f"resume_{user_id}_{resume_id}"
-            self.index.delete(ids=[vector_id])
+            vector_id = f"{kind}_{user_id}_{obj_id}"
+            self.index.delete(ids=[vector_id], namespace=_user_namespace(user_id))
+            self._forget_local(kind, user_id, vector_id)
             return True
         except Exception as e:
-            print(f"Error deleting resume embedding: {e}")
+            print(f"Error deleting {kind} embedding: {e}")
             return False
     
+    def delete_resume_embedding(self, resume_id: int, user_id: int) -> bool:
+        """Delete resume embedding from Pinecone"""
+        return self._delete('resume', resume_id, user_id)
+    
     def delete_job_embedding(self, job_id: int, user_id: int) -> bool:
         """Delete job embedding from Pinecone"""
+        return self._delete('job', job_id, user_id)
+    
+    def _count_vectors(self, kind: str, user_id: int) -> int:
+        """Count a user's vectors of one kind without running a similarity query"""
         try:
-            vector_id = f"job_{user_id}_{job_id}"
-            self.index.delete(ids=[vector_id])
-            return True
-        except Exception as e:
-            print(f"Error deleting job embedding: {e}")
-            return False
+            # Serverless indexes list ids by prefix; ids are f"{kind}_{user_id}_{id}"
+            return sum(len(ids) for ids in self.index.list(prefix=f"{kind}_{user_id}_",
+                                                           namespace=_user_namespace(user_id)))
+        except Exception:
+            # Pod-based indexes instead support metadata-filtered stats
+            stats = self.index.describe_index_stats(filter={'type': kind, 'user_id': user_id})
+            return stats.total_vector_count
     
     def get_user_embeddings_stats(self, user_id: int) -> Dict[str, int]:
         """Get statistics about user's embeddings"""
         try:
-            # Query for user's resumes
-            resume_results = self.index.query(
-                vector=[0] * self.vector_dimension,  # Dummy vector
-                top_k=1000,  # Large number to get all
-                include_metadata=True,
-                filter={'type': 'resume', 'user_id': user_id}
-            )
-            
-            # Query for user's jobs
-            job_results = self.index.query(
-                vector=[0] * self.vector_dimension,  # Dummy vector
-                top_k=1000,  # Large number to get all
-                include_metadata=True,
-                filter={'type': 'job', 'user_id': user_id}
-            )
-            
             return {
-                'resumes': len(resume_results.matches),
-                'jobs': len(job_results.matches)
+                'resumes': self._count_vectors('resume', user_id),
+                'jobs': self._count_vectors('job', user_id)
             }
             
         except Exception as e:
@@ -292,15 +598,13 @@ class PineconeVectorDB:
                 filter_dict['type'] = 'job'
             # If search_type == 'all', no type filter
             
-            if user_id:
-                filter_dict['user_id'] = user_id
-            
-            # Query Pinecone
+            # Query Pinecone; the user's namespace scopes the search
             results = self.index.query(
-                vector=query_embedding,
+                vector=query_embedding.tolist(),
                 top_k=top_k,
                 include_metadata=True,
-                filter=filter_dict if filter_dict else None
+                filter=filter_dict if filter_dict else None,
+                namespace=_user_namespace(user_id)
             )
             
             return [
@@ -308,7 +612,7 @@ class PineconeVectorDB:
                     'id': match.id,
                     'type': match.metadata.get('type'),
                     'score': match.score,
-                    'preview': match.metadata.get('text_preview', ''),
+                    'preview': '',  # filled from the database by the caller
                     'metadata': match.metadata
                 }
                 for match in results.matches
@@ -317,6 +621,44 @@ class PineconeVectorDB:
         except Exception as e:
             print(f"Error in semantic search: {e}")
             return []
+    
+    def migrate_to_user_namespaces(self) -> Dict[str, int]:
+        """One-off move of vectors from the default namespace into per-user namespaces.
+
+        Vectors written before namespaces were introduced carry user_id only in
+        metadata; this re-upserts each into its user's namespace and removes the
+        original. All ids are listed before anything is moved, and a vector that
+        already exists in its user's namespace (written after the switch) is never
+        overwritten: only the stale default-namespace copy is removed. Safe to re-run.
+        Returns counts of moved, skipped (already migrated) and unowned vectors.
+        """
+        ids = [vector_id for page in self.index.list(namespace="") for vector_id in page]
+        counts = {'moved': 0, 'skipped': 0, 'unowned': 0}
+        for start in range(0, len(ids), _FETCH_BATCH_SIZE):
+            fetched = self.index.fetch(ids=ids[start:start + _FETCH_BATCH_SIZE], namespace="").vectors
+            by_namespace: Dict[str, List[Dict[str, Any]]] = {}
+            for vector_id, vector in fetched.items():
+                metadata = vector.metadata or {}
+                if not metadata.get('user_id'):
+                    counts['unowned'] += 1
+                    continue
+                # Pinecone returns numeric metadata as floats
+                by_namespace.setdefault(_user_namespace(int(metadata['user_id'])), []).append({
+                    'id': vector_id,
+                    'values': vector.values,
+                    'metadata': metadata
+                })
+            for namespace, vectors in by_namespace.items():
+                existing = self.index.fetch(ids=[v['id'] for v in vectors], namespace=namespace).vectors
+                fresh = [v for v in vectors if v['id'] not in existing]
+                if fresh:
+                    self.upsert_batch(fresh, namespace)
+                self.index.delete(ids=[v['id'] for v in vectors], namespace="")
+                counts['moved'] += len(fresh)
+                counts['skipped'] += len(vectors) - len(fresh)
+        return counts
 
-# Initialize vector database instance
-vector_db = PineconeVectorDB()
+@lru_cache(maxsize=1)
+def get_vector_db() -> PineconeVectorDB:
+    """Process-wide vector database instance, created on first use"""
+    return PineconeVectorDB()
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("pydantic")
+
+from services.jd_compress import compress
+
+
+FILLER = "Our team ships weekly and values clear written communication across time zones. "
+
+
+def test_short_description_is_returned_unchanged():
+    assert compress("  Python developer wanted.  ") == "Python developer wanted."
+
+
+def test_single_paragraph_mentioning_benefits_is_not_emptied():
+    jd = (
+        "We are hiring a backend engineer with 5 years of experience in Python and Django. "
+        "You will design REST microservices on AWS with Docker and Kubernetes. "
+        "We offer great benefits and a friendly team. "
+        + FILLER * 40
+    )
+    result = compress(jd, max_tokens=60)
+    assert result
+    assert "Python and Django" in result
+
+
+def test_heading_section_is_dropped():
+    jd = (
+        "Requirements:\n"
+        "Strong experience with Python, SQL and AWS is required.\n"
+        "You must design and build REST APIs with Django.\n"
+        "\n"
+        "Benefits\n"
+        "Unlimited PTO, python lunches and a docker-themed gym.\n"
+        "\n"
+        + FILLER * 40
+    )
+    result = compress(jd, max_tokens=60)
+    assert "Strong experience with Python" in result
+    assert "Unlimited PTO" not in result
+
+
+def test_all_boilerplate_falls_back_to_truncated_text():
+    jd = "About us\n" + FILLER.strip() * 60
+    result = compress(jd, max_tokens=50)
+    assert result
@@ -0,0 +1,62 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pinecone")
+pytest.importorskip("google.generativeai")
+
+from services import vector_db
+from services.vector_db import PineconeVectorDB, _LocalIndex
+
+
+def test_local_index_ranks_by_cosine_similarity():
+    index = _LocalIndex(
+        ["a", "b", "c"],
+        [[1.0, 0.0], [0.0, 2.0], [3.0, 3.0]],
+        [{"n": 1}, {"n": 2}, {"n": 3}],
+        dimension=2
+    )
+    results = index.search([0.0, 5.0], top_k=2)
+    assert [vector_id for vector_id, _, _ in results] == ["b", "c"]
+    assert results[0][1] == pytest.approx(1.0)
+    assert results[0][2] == {"n": 2}
+
+
+def test_local_index_handles_small_and_zero_queries():
+    index = _LocalIndex(["a"], [[1.0, 0.0]], [{}], dimension=2)
+    assert [r[0] for r in index.search([1.0, 1.0], top_k=5)] == ["a"]
+    assert index.search([0.0, 0.0], top_k=5) == []
+    assert _LocalIndex([], [], [], dimension=2).search([1.0, 0.0], top_k=3) == []
+
+
+def test_local_index_upsert_replaces_and_remove_drops():
+    index = _LocalIndex(["a"], [[1.0, 0.0]], [{}], dimension=2)
+    index.upsert("a", [0.0, 1.0], {"v": 2})
+    index.upsert("b", [1.0, 0.0], {})
+    assert index.search([0.0, 1.0], top_k=1)[0][:1] == ("a",)
+    index.remove("a")
+    assert [r[0] for r in index.search([0.0, 1.0], top_k=5)] == ["b"]
+
+
+def test_embed_batch_embeds_duplicate_texts_once(monkeypatch):
+    calls = []
+    
+    def fake_embed_content(model, content, task_type):
+        calls.append(list(content))
+        return {"embedding": [[float(len(text)), 1.0] for text in content]}
+    
+    monkeypatch.setattr(vector_db.genai, "embed_content", fake_embed_content)
+    monkeypatch.setattr(vector_db, "_load_embedding", lambda key: None)
+    monkeypatch.setattr(vector_db, "_save_embedding", lambda key, embedding: None)
+    
+    db = PineconeVectorDB.__new__(PineconeVectorDB)
+    db.embedding_model_name = "models/test"
+    db.vector_dimension = 2
+    
+    embeddings = db.embed_batch(["python", "go", "python", "go", "rust"])
+    
+    assert calls == [["python", "go", "rust"]]
+    assert embeddings.shape == (5, 2)
+    assert embeddings.dtype == np.float32
+    np.testing.assert_array_equal(embeddings[0], embeddings[2])
+    np.testing.assert_array_equal(embeddings[1], embeddings[3])
+    assert np.linalg.norm(embeddings[4]) == pytest.approx(1.0, abs=1e-3)